@@ -0,0 +1,82 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+from common import SRC_DIR, throwaway_key_env
+
+READY_PATH = "/.well-known/jwks.json"
+
+
+def server_command(server: str, port: int, workers: int, preload: bool) -> list[str]:
+    if server == "gunicorn":
+        command = [
+            sys.executable, "-m", "gunicorn", "main:create_app()",
+            "--workers", str(workers), "--worker-class", "uvicorn.workers.UvicornWorker",
+            "--bind", f"127.0.0.1:{port}", "--log-level", "warning",
+        ]
+        return command + ["--preload"] if preload else command
+    return [
+        sys.executable, "-m", "uvicorn", "--factory", "main:create_app",
+        "--host", "127.0.0.1", "--port", str(port), "--workers", str(workers), "--log-level", "warning",
+    ]
+
+
+def first_response_seconds(url: str, started: float, timeout: float) -> float:
+    deadline = started + timeout
+    while time.perf_counter() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                if response.status == 200:
+                    return time.perf_counter() - started
+        except (urllib.error.URLError, ConnectionError, TimeoutError):
+            pass
+        time.sleep(0.01)
+    raise RuntimeError(f"no response from {url} within {timeout}s")
+
+
+def measure(command: list[str], url: str, timeout: float) -> float:
+    with tempfile.TemporaryDirectory() as key_dir:
+        env = {**os.environ, **throwaway_key_env(Path(key_dir)), "MAIL_TRANSPORT": "null"}
+        started = time.perf_counter()
+        process = subprocess.Popen(command, cwd=SRC_DIR, env=env)
+        try:
+            return first_response_seconds(url, started, timeout)
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+
+
+def main(args: argparse.Namespace) -> dict:
+    command = server_command(args.server, args.port, args.workers, not args.no_preload)
+    url = f"http://127.0.0.1:{args.port}{READY_PATH}"
+    samples = [measure(command, url, args.timeout) for _ in range(args.runs)]
+    return {
+        "server": args.server,
+        "workers": args.workers,
+        "preload": args.server == "gunicorn" and not args.no_preload,
+        "runs": args.runs,
+        "first_request_ms": {
+            "median": round(statistics.median(samples) * 1000, 1),
+            "min": round(min(samples) * 1000, 1),
+            "max": round(max(samples) * 1000, 1),
+        },
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time from process start to the first served request")
+    parser.add_argument("--server", choices=("gunicorn", "uvicorn"), default="gunicorn")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--no-preload", action="store_true", help="import the app in every gunicorn worker")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--timeout", type=float, default=60)
+    print(json.dumps(main(parser.parse_args()), indent=2))
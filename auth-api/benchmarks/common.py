@@ -0,0 +1,80 @@
+import json
+import statistics
+import sys
+import timeit
+from pathlib import Path
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+BASELINES_DIR = Path(__file__).resolve().parent / "baselines"
+sys.path.insert(0, str(SRC_DIR))
+
+
+def write_key_pair(directory: Path, private_key) -> tuple[Path, Path]:
+    private_path = directory / "private.pem"
+    public_path = directory / "public.pem"
+    private_path.write_bytes(private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ))
+    public_path.write_bytes(private_key.public_key().public_bytes(
+        serialization.Encoding.PEM,
+        serialization.PublicFormat.SubjectPublicKeyInfo,
+    ))
+    return private_path, public_path
+
+
+def throwaway_key_env(directory: Path) -> dict[str, str]:
+    private_path, public_path = write_key_pair(
+        directory, rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    )
+    return {
+        "ALGORITHM": "RS256",
+        "JWT_PRIVATE_KEY_PATH": str(private_path),
+        "JWT_PUBLIC_KEY_PATH": str(public_path),
+        "JWT_VERIFICATION_KEYS_DIR": str(directory / "verification"),
+    }
+
+
+def per_call_us(func, number: int, repeat: int = 5) -> float:
+    timer = timeit.Timer(func)
+    timer.timeit(number=max(1, number // 10))
+    return min(timer.repeat(repeat=repeat, number=number)) / number * 1_000_000
+
+
+def measure_us(func, number: int, repeat: int = 9, warmup: int = 1) -> dict:
+    timer = timeit.Timer(func)
+    for _ in range(warmup):
+        timer.timeit(number=number)
+    samples = sorted(run / number * 1_000_000 for run in timer.repeat(repeat=repeat, number=number))
+    q1, _, q3 = statistics.quantiles(samples, n=4, method="inclusive")
+    return {
+        "median_us": round(statistics.median(samples), 3),
+        "iqr_us": round(q3 - q1, 3),
+        "min_us": round(samples[0], 3),
+        "calls": number * repeat,
+    }
+
+
+def load_baseline(path: Path) -> dict | None:
+    return json.loads(path.read_text()) if path.exists() else None
+
+
+def save_baseline(path: Path, results: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(results, indent=2) + "\n")
+
+
+def regressions(results: dict, baseline: dict, threshold: float) -> list[str]:
+    found = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        limit = previous["median_us"] * (1 + threshold) + previous["iqr_us"]
+        if current["median_us"] > limit:
+            found.append(f"{name}: median {current['median_us']}us > baseline {previous['median_us']}us")
+    return found
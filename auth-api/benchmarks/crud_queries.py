@@ -0,0 +1,85 @@
+import asyncio
+import time
+import tracemalloc
+
+import common  # noqa: F401
+
+from sqlalchemy import String, bindparam, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db import crud
+from db.database import dispose_engines, init_engines
+from db.models import User
+
+EMAIL = "bench-lookup@hotel.com"
+USER_BY_EMAIL = select(User).where(func.lower(User.email) == bindparam("email", type_=String))
+
+
+async def legacy_get_user_by_email(email: str, session: AsyncSession):
+    query = select(User).where(User.email == email)
+    response = await session.execute(query)
+    return response.scalars().first()
+
+
+async def prebuilt_get_user_by_email(email: str, session: AsyncSession):
+    response = await session.execute(USER_BY_EMAIL, {"email": email})
+    return response.scalars().first()
+
+
+async def measure(name: str, lookup, session: AsyncSession, number: int) -> dict:
+    for _ in range(number // 10):
+        await lookup(email=EMAIL, session=session)
+        session.expunge_all()
+
+    peaks = []
+    cpu_started = time.process_time()
+    wall_started = time.perf_counter()
+    for _ in range(number):
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        await lookup(email=EMAIL, session=session)
+        peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+        session.expunge_all()
+    cpu = time.process_time() - cpu_started
+    wall = time.perf_counter() - wall_started
+    return {
+        "lookup": name,
+        "cpu_us": cpu / number * 1_000_000,
+        "wall_us": wall / number * 1_000_000,
+        "peak_alloc_bytes": sum(peaks) / len(peaks),
+    }
+
+
+async def main(number: int = 2000) -> None:
+    engine = init_engines()
+    async with engine.connect() as connection:
+        transaction = await connection.begin()
+        session = AsyncSession(bind=connection, expire_on_commit=False)
+        session.add(User(email=EMAIL, full_name="Bench", hashed_password=b"x", is_verified=True))
+        await session.flush()
+
+        tracemalloc.start()
+        results = [
+            await measure("orm select per call", legacy_get_user_by_email, session, number),
+            await measure("orm prebuilt", prebuilt_get_user_by_email, session, number),
+            await measure("record projection", crud.get_user_record_by_email, session, number),
+            await measure("login projection", crud.get_login_row_by_email, session, number),
+        ]
+        tracemalloc.stop()
+
+        await session.close()
+        await transaction.rollback()
+    await dispose_engines()
+
+    print(f"{'lookup':<22}{'cpu':>12}{'wall':>12}{'peak alloc':>14}")
+    for result in results:
+        print(
+            f"{result['lookup']:<22}"
+            f"{result['cpu_us']:>10.1f}us"
+            f"{result['wall_us']:>10.1f}us"
+            f"{result['peak_alloc_bytes']:>12.0f} B"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,60 @@
+import argparse
+import asyncio
+import sys
+
+import common  # noqa: F401
+
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+
+from db import queries
+from db.database import dispose_engines, init_engines
+
+INDEX = "ix_users_email_lower"
+EMAIL = "bench-user-4242@hotel.com"
+
+LOOKUPS = {
+    "email_exists": (queries.email_exists, {"email": EMAIL}),
+    "password_by_email": (queries.password_by_email, {"email": EMAIL}),
+    "user_record_by_email": (queries.user_record_by_email, {"email": EMAIL}),
+    "user_records_by_emails": (queries.user_records_by_emails, {"emails": [EMAIL, "bench-user-7@hotel.com"]}),
+    "login_row_by_email": (queries.login_row_by_email, {"email": EMAIL}),
+}
+
+
+def explain_sql(query, params: dict) -> str:
+    compiled = query.params(**params).compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+    return f"EXPLAIN {compiled}"
+
+
+async def main(rows: int) -> int:
+    engine = init_engines()
+    failures = 0
+    try:
+        async with engine.connect() as connection:
+            transaction = await connection.begin()
+            await connection.execute(
+                text(
+                    "INSERT INTO users (full_name, email, hashed_password, active, is_verified) "
+                    "SELECT 'Bench', 'Bench-User-' || n || '@Hotel.com', 'x', true, true "
+                    "FROM generate_series(1, :rows) AS n"
+                ),
+                {"rows": rows},
+            )
+            await connection.execute(text("ANALYZE users"))
+
+            for name, (query, params) in LOOKUPS.items():
+                plan = "\n".join((await connection.execute(text(explain_sql(query, params)))).scalars())
+                uses_index = INDEX in plan and "Seq Scan on users" not in plan
+                failures += not uses_index
+                print(f"{'ok' if uses_index else 'FAIL'} {name}\n{plan}\n")
+            await transaction.rollback()
+    finally:
+        await dispose_engines()
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check that every email lookup plans against lower(email)")
+    parser.add_argument("--rows", type=int, default=100_000)
+    sys.exit(asyncio.run(main(parser.parse_args().rows)))
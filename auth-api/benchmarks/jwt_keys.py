@@ -0,0 +1,65 @@
+import tempfile
+from pathlib import Path
+
+from common import per_call_us, write_key_pair
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+
+from core.keys import JWTKeyManager
+
+KEYS = {
+    "RS256": lambda: rsa.generate_private_key(public_exponent=65537, key_size=2048),
+    "ES256": lambda: ec.generate_private_key(ec.SECP256R1()),
+    "EdDSA": lambda: ed25519.Ed25519PrivateKey.generate(),
+}
+PAYLOAD = {"type": "access", "sub": "guest@hotel.com", "email": "guest@hotel.com"}
+
+
+def bench_algorithm(algorithm: str, number: int) -> dict:
+    with tempfile.TemporaryDirectory() as directory:
+        private_path, public_path = write_key_pair(Path(directory), KEYS[algorithm]())
+        private_pem, public_pem = private_path.read_text(), public_path.read_text()
+        manager = JWTKeyManager(private_path, public_path, Path(directory) / "verification", algorithm, 60)
+        manager.load()
+
+        signing_key = manager.signing_key()
+        token = jwt.encode(PAYLOAD, signing_key.private_key, algorithm=algorithm, headers={"kid": signing_key.kid})
+
+        def sign_pem():
+            jwt.encode(PAYLOAD, private_pem, algorithm=algorithm)
+
+        def verify_pem():
+            jwt.decode(token, public_pem, algorithms=[algorithm])
+
+        def sign_cached():
+            key = manager.signing_key()
+            jwt.encode(PAYLOAD, key.private_key, algorithm=key.algorithm, headers={"kid": key.kid})
+
+        def verify_cached():
+            key = manager.verification_key(jwt.get_unverified_header(token)["kid"])
+            jwt.decode(token, key.public_key, algorithms=[key.algorithm])
+
+        return {
+            "sign_pem_us": per_call_us(sign_pem, number),
+            "sign_cached_us": per_call_us(sign_cached, number),
+            "verify_pem_us": per_call_us(verify_pem, number),
+            "verify_cached_us": per_call_us(verify_cached, number),
+        }
+
+
+def main(number: int = 200) -> None:
+    print(f"{'algorithm':<10}{'sign pem':>12}{'sign cached':>14}{'verify pem':>13}{'verify cached':>16}")
+    for algorithm in KEYS:
+        result = bench_algorithm(algorithm, number)
+        print(
+            f"{algorithm:<10}"
+            f"{result['sign_pem_us']:>10.1f}us"
+            f"{result['sign_cached_us']:>12.1f}us"
+            f"{result['verify_pem_us']:>11.1f}us"
+            f"{result['verify_cached_us']:>14.1f}us"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,300 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from collections import defaultdict
+from pathlib import Path
+from typing import AsyncIterator
+
+import httpx
+
+from common import BASELINES_DIR, SRC_DIR, throwaway_key_env
+
+BASELINE_PATH = BASELINES_DIR / "load.json"
+PASSWORD = "load-test-password"
+SCENARIOS = ("login", "refresh", "create", "authenticated")
+UNTHROTTLED = 1_000_000_000
+
+
+def seed_email(run_id: str, index: int) -> str:
+    return f"load-{run_id}-{index}@bench.local"
+
+
+async def seed_lines(run_id: str, count: int) -> AsyncIterator[str]:
+    yield "email,full_name,password"
+    for index in range(count):
+        yield f"{seed_email(run_id, index)},Load {index},{PASSWORD}"
+
+
+async def seed_users(run_id: str, count: int) -> None:
+    from core.bulk_import import import_users
+    from core.hashing import password_hasher
+    from db.database import async_session, dispose_engines, init_engines
+
+    init_engines()
+    password_hasher.start()
+    try:
+        async with async_session() as session:
+            report = await import_users(
+                lines=seed_lines(run_id, count),
+                file_format="csv",
+                session=session,
+                verified=True,
+            )
+    finally:
+        password_hasher.shutdown()
+        await dispose_engines()
+    if report.created != count:
+        raise RuntimeError(f"seeded {report.created} of {count} users: {report.model_dump_json()}")
+
+
+def start_server(port: int, workers: int, key_dir: Path) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        **throwaway_key_env(key_dir),
+        "MAIL_TRANSPORT": "null",
+        "LOGIN_THROTTLE_MAX_PER_IP": str(UNTHROTTLED),
+        "LOGIN_THROTTLE_MAX_PER_EMAIL": str(UNTHROTTLED),
+    }
+    return subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "--factory", "main:create_app",
+            "--host", "127.0.0.1", "--port", str(port),
+            "--workers", str(workers), "--no-access-log", "--log-level", "warning",
+        ],
+        cwd=SRC_DIR,
+        env=env,
+    )
+
+
+async def wait_ready(client: httpx.AsyncClient, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get("/.well-known/jwks.json")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("server did not become ready")
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+
+    def record(self, scenario: str, elapsed: float, ok: bool) -> None:
+        self.latencies[scenario].append(elapsed)
+        if not ok:
+            self.errors[scenario] += 1
+
+
+class VirtualUser:
+    def __init__(self, client: httpx.AsyncClient, run_id: str, email: str, recorder: Recorder):
+        self.client = client
+        self.run_id = run_id
+        self.email = email
+        self.recorder = recorder
+        self.access_token = ""
+        self.refresh_token = ""
+
+    async def authenticate(self) -> None:
+        response = await self._login()
+        if response.status_code == 429:
+            raise RuntimeError(
+                f"login for {self.email} was throttled, raise LOGIN_THROTTLE_MAX_PER_IP and "
+                "LOGIN_THROTTLE_MAX_PER_EMAIL on the target server"
+            )
+        if response.status_code != 200:
+            raise RuntimeError(f"could not log in as {self.email}: {response.status_code} {response.text}")
+
+    async def _login(self) -> httpx.Response:
+        response = await self.client.post("/api/v1/login", data={"username": self.email, "password": PASSWORD})
+        if response.status_code == 200:
+            tokens = response.json()
+            self.access_token = tokens["access_token"]
+            self.refresh_token = tokens["refresh_token"]
+        return response
+
+    async def login(self) -> bool:
+        return (await self._login()).status_code == 200
+
+    async def refresh(self) -> bool:
+        response = await self.client.post(
+            "/api/v1/refresh",
+            headers={"Authorization": f"Bearer {self.refresh_token}"},
+        )
+        if response.status_code != 200:
+            return False
+        tokens = response.json()
+        self.access_token = tokens["access_token"]
+        self.refresh_token = tokens.get("refresh_token", self.refresh_token)
+        return True
+
+    async def create(self) -> bool:
+        response = await self.client.post("/api/v1/create", json={
+            "email": f"load-{self.run_id}-new-{uuid.uuid4().hex[:12]}@bench.local",
+            "hashed_password": PASSWORD,
+            "full_name": "Load New",
+        })
+        return response.status_code == 201
+
+    async def authenticated(self) -> bool:
+        response = await self.client.get(
+            "/api/v1/me",
+            headers={"Authorization": f"Bearer {self.access_token}"},
+        )
+        return response.status_code == 200
+
+    async def run(self, mix: dict[str, float], deadline: float) -> None:
+        scenarios = list(mix)
+        weights = list(mix.values())
+        while time.perf_counter() < deadline:
+            scenario = random.choices(scenarios, weights)[0]
+            started = time.perf_counter()
+            try:
+                ok = await getattr(self, scenario)()
+            except httpx.HTTPError:
+                ok = False
+            self.recorder.record(scenario, time.perf_counter() - started, ok)
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies: list[float], errors: int, duration: float) -> dict:
+    latencies = sorted(latencies)
+    requests = len(latencies)
+    return {
+        "requests": requests,
+        "errors": errors,
+        "error_rate": round(errors / requests, 4) if requests else 0.0,
+        "throughput_rps": round(requests / duration, 2),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+    }
+
+
+def build_report(recorder: Recorder, duration: float, config: dict) -> dict:
+    scenarios = {
+        scenario: summarize(recorder.latencies[scenario], recorder.errors[scenario], duration)
+        for scenario in SCENARIOS if recorder.latencies[scenario]
+    }
+    everything = [latency for latencies in recorder.latencies.values() for latency in latencies]
+    return {
+        "config": config,
+        "duration_seconds": round(duration, 2),
+        "total": summarize(everything, sum(recorder.errors.values()), duration),
+        "scenarios": scenarios,
+    }
+
+
+def compare(report: dict, baseline: dict, threshold: float) -> list[str]:
+    regressions = []
+    for scenario, current in {"total": report["total"], **report["scenarios"]}.items():
+        previous = baseline["total"] if scenario == "total" else baseline["scenarios"].get(scenario)
+        if not previous:
+            continue
+        if current["throughput_rps"] < previous["throughput_rps"] * (1 - threshold):
+            regressions.append(
+                f"{scenario}: throughput {current['throughput_rps']} rps < baseline {previous['throughput_rps']} rps"
+            )
+        for key in ("p95_ms", "p99_ms"):
+            if previous[key] and current[key] > previous[key] * (1 + threshold):
+                regressions.append(f"{scenario}: {key} {current[key]} > baseline {previous[key]}")
+        if current["error_rate"] > previous["error_rate"] + 0.01:
+            regressions.append(f"{scenario}: error rate {current['error_rate']} > baseline {previous['error_rate']}")
+    return regressions
+
+
+def parse_mix(value: str) -> dict[str, float]:
+    mix = {}
+    for part in value.split(","):
+        scenario, _, weight = part.partition("=")
+        if scenario not in SCENARIOS:
+            raise argparse.ArgumentTypeError(f"unknown scenario {scenario!r}, expected one of {SCENARIOS}")
+        mix[scenario] = float(weight or 1)
+    return {scenario: weight for scenario, weight in mix.items() if weight > 0}
+
+
+async def main(args: argparse.Namespace) -> dict:
+    run_id = uuid.uuid4().hex[:8]
+    if args.users:
+        await seed_users(run_id, args.users)
+
+    key_dir = tempfile.TemporaryDirectory()
+    server = None if args.url else start_server(args.port, args.workers, Path(key_dir.name))
+    base_url = args.url or f"http://127.0.0.1:{args.port}"
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    try:
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=args.timeout) as client:
+            await wait_ready(client)
+            recorder = Recorder()
+            virtual_users = [
+                VirtualUser(client, run_id, seed_email(run_id, index % args.users), recorder)
+                for index in range(args.concurrency)
+            ]
+            await asyncio.gather(*(virtual_user.authenticate() for virtual_user in virtual_users))
+
+            started = time.perf_counter()
+            deadline = started + args.duration
+            await asyncio.gather(*(virtual_user.run(args.mix, deadline) for virtual_user in virtual_users))
+            duration = time.perf_counter() - started
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+        key_dir.cleanup()
+
+    return build_report(recorder, duration, {
+        "users": args.users,
+        "concurrency": args.concurrency,
+        "workers": None if args.url else args.workers,
+        "mix": args.mix,
+    })
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test login, refresh, create and authenticated endpoints")
+    parser.add_argument("--users", type=int, default=200, help="synthetic verified users to seed")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=30, help="seconds of measured traffic")
+    parser.add_argument("--mix", type=parse_mix, default="login=1,refresh=3,create=1,authenticated=10")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers for the booted app")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--url", help="target an already running server instead of booting main:create_app")
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--output", type=Path, help="write the JSON report here")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed relative regression")
+    args = parser.parse_args()
+    if args.users < 1:
+        parser.error("--users must be at least 1")
+
+    report = asyncio.run(main(args))
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        args.output.write_text(output + "\n")
+
+    if args.save_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(output + "\n")
+    elif args.baseline.exists():
+        regressions = compare(report, json.loads(args.baseline.read_text()), args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        sys.exit(1 if regressions else 0)
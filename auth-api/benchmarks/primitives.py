@@ -0,0 +1,144 @@
+import argparse
+import sys
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from unittest import mock
+
+from common import BASELINES_DIR, load_baseline, measure_us, regressions, save_baseline
+
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+
+from api.v1.schemas import CreateUser, UserOut
+from core import helpers, passwords, utils
+from core.cache import UserRecord
+from core.keys import JWTKeyManager
+from core.passwords import HashPolicy
+from db.models import User
+from jwt_keys import PAYLOAD, write_key_pair
+
+BASELINE_PATH = BASELINES_DIR / "primitives.json"
+PASSWORD = "correct horse battery staple"
+KEY_VARIANTS = {
+    "RS256-2048": ("RS256", lambda: rsa.generate_private_key(public_exponent=65537, key_size=2048)),
+    "RS256-3072": ("RS256", lambda: rsa.generate_private_key(public_exponent=65537, key_size=3072)),
+    "RS256-4096": ("RS256", lambda: rsa.generate_private_key(public_exponent=65537, key_size=4096)),
+    "ES256-P256": ("ES256", lambda: ec.generate_private_key(ec.SECP256R1())),
+    "ES384-P384": ("ES384", lambda: ec.generate_private_key(ec.SECP384R1())),
+    "EdDSA-Ed25519": ("EdDSA", lambda: ed25519.Ed25519PrivateKey.generate()),
+}
+BCRYPT_COSTS = (10, 11, 12)
+USER = UserRecord(
+    id=1,
+    email="guest@hotel.com",
+    full_name="Hotel Guest",
+    active=True,
+    is_verified=True,
+    created_at=datetime.now(timezone.utc),
+    roles=("guest",),
+    role_mask=2,
+)
+
+
+@contextmanager
+def key_variant(directory: Path, variant: str):
+    algorithm, generate = KEY_VARIANTS[variant]
+    key_dir = directory / variant
+    key_dir.mkdir()
+    private_path, public_path = write_key_pair(key_dir, generate())
+    manager = JWTKeyManager(private_path, public_path, key_dir / "verification", algorithm, 60)
+    manager.load()
+    with mock.patch.object(utils, "key_manager", manager):
+        yield
+
+
+def bench_jwt(number: int) -> dict:
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for variant in KEY_VARIANTS:
+            with key_variant(Path(directory), variant):
+                token = utils.encode_jwt(PAYLOAD)
+                results[f"encode_jwt[{variant}]"] = measure_us(lambda: utils.encode_jwt(PAYLOAD), number)
+                results[f"decode_jwt[{variant}]"] = measure_us(lambda: utils.decode_jwt(token), number)
+                if variant == "RS256-2048":
+                    results["create_access_token"] = measure_us(lambda: helpers.create_access_token(USER), number)
+                    results["create_refresh_token"] = measure_us(lambda: helpers.create_refresh_token(USER), number)
+    return results
+
+
+def bench_passwords(repeat: int) -> dict:
+    results = {}
+    for cost in BCRYPT_COSTS:
+        policy = HashPolicy(bcrypt_rounds=cost)
+        hashed = passwords.hash_password(PASSWORD, policy)
+        results[f"hash_password[bcrypt={cost}]"] = measure_us(
+            lambda: passwords.hash_password(PASSWORD, policy), 1, repeat=repeat,
+        )
+        results[f"validate_password[bcrypt={cost}]"] = measure_us(
+            lambda: passwords.validate_password(PASSWORD, hashed), 1, repeat=repeat,
+        )
+    return results
+
+
+def bench_schemas(number: int) -> dict:
+    create_user = {"email": "guest@hotel.com", "hashed_password": PASSWORD, "full_name": "Hotel Guest"}
+    orm_user = User(
+        id=1,
+        email="guest@hotel.com",
+        full_name="Hotel Guest",
+        hashed_password=b"x",
+        created_at=datetime.now(timezone.utc),
+    )
+    return {
+        "CreateUser.model_validate": measure_us(lambda: CreateUser.model_validate(create_user), number),
+        "UserOut.model_validate[orm]": measure_us(lambda: UserOut.model_validate(orm_user), number),
+    }
+
+
+GROUPS = {
+    "jwt": lambda args: bench_jwt(args.number),
+    "passwords": lambda args: bench_passwords(args.password_repeat),
+    "schemas": lambda args: bench_schemas(args.number * 10),
+}
+
+
+def main(args: argparse.Namespace) -> int:
+    results = {}
+    for group in args.groups or GROUPS:
+        results.update(GROUPS[group](args))
+
+    baseline = load_baseline(args.baseline)
+    print(f"{'benchmark':<32}{'median':>14}{'iqr':>12}{'baseline':>14}")
+    for name, result in results.items():
+        previous = baseline.get(name, {}).get("median_us") if baseline else None
+        print(
+            f"{name:<32}"
+            f"{result['median_us']:>12.1f}us"
+            f"{result['iqr_us']:>10.1f}us"
+            f"{f'{previous:.1f}us' if previous is not None else '-':>14}"
+        )
+
+    if args.save_baseline:
+        save_baseline(args.baseline, {**(baseline or {}), **results})
+        return 0
+    if baseline is None:
+        return 0
+    found = regressions(results, baseline, args.threshold)
+    for regression in found:
+        print(f"REGRESSION {regression}", file=sys.stderr)
+    return 1 if found else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Microbenchmarks for JWT, password hashing and schema validation")
+    parser.add_argument("groups", nargs="*", help=f"benchmark groups to run, any of {', '.join(GROUPS)}; all by default")
+    parser.add_argument("--number", type=int, default=200, help="calls per timed run")
+    parser.add_argument("--password-repeat", type=int, default=7, help="timed runs per bcrypt benchmark")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--threshold", type=float, default=0.15, help="allowed relative slowdown of the median")
+    args = parser.parse_args()
+    if unknown := set(args.groups) - set(GROUPS):
+        parser.error(f"unknown benchmark groups: {', '.join(sorted(unknown))}")
+    sys.exit(main(args))
@@ -4,4 +4,6 @@ alembic upgrade head
 
 cd src
 
-gunicorn main:app --workers 1 --worker-class uvicorn.workers.UvicornWorker --bind=0.0.0.0:8080
\ No newline at end of file
+WORKERS=${WORKERS:-1}
+
+gunicorn 'main:create_app()' --preload --workers "$WORKERS" --worker-class uvicorn.workers.UvicornWorker --bind=0.0.0.0:8080
@@ -0,0 +1,51 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+
+from core.cache import recent_emails, user_cache
+from core.hashing import password_hasher
+from core.mail import mail_queue
+from core.maintenance import maintenance_scheduler
+from core.metrics import http_request_duration, stage_duration, render_stats
+from core.network import require_internal_network
+from core.revocation import revocation_index
+from core.sessions import refresh_sessions
+from core.throttling import login_throttle
+from db import database
+
+router = APIRouter(tags=["Metrics"])
+
+COUNTERS = frozenset({
+    "completed", "rejected", "timed_out", "busy_seconds", "rehashed",
+    "sent", "retried", "dropped",
+    "hits", "misses", "evictions", "invalidations",
+    "checks", "bloom_positives",
+    "checkouts", "checkout_seconds_total", "timeouts",
+    "throttled_email", "throttled_ip", "backend_errors",
+    "started", "rotated", "reuse_detected", "analyzed",
+}) | {f"{job.name}_{kind}" for job in maintenance_scheduler.jobs for kind in ("runs", "purged", "failures")}
+
+
+def collect_stats() -> dict:
+    stats = {
+        "password_hasher": password_hasher.stats(),
+        "mail_queue": mail_queue.stats(),
+        "user_cache": user_cache.stats(),
+        "recent_emails": recent_emails.stats(),
+        "revocation": revocation_index.stats(),
+        "login_throttle": login_throttle.stats(),
+        "refresh_sessions": refresh_sessions.stats(),
+        "maintenance": maintenance_scheduler.stats(),
+    }
+    if database.engine is not None:
+        stats["db_pool"] = database.pool_stats(database.engine)
+    if database.read_engine is not database.engine:
+        stats["db_read_pool"] = database.pool_stats(database.read_engine)
+    return stats
+
+
+@router.get("/metrics", response_class=PlainTextResponse, dependencies=[Depends(require_internal_network)])
+def metrics():
+    lines = [*http_request_duration.render(), *stage_duration.render()]
+    for component, stats in collect_stats().items():
+        lines.extend(render_stats(component, stats, COUNTERS))
+    return PlainTextResponse("\n".join(lines) + "\n", media_type="text/plain; version=0.0.4")
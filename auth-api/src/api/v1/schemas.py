@@ -1,13 +1,21 @@
+import uuid
 from datetime import datetime
 from typing import Annotated
 from annotated_types import MinLen, MaxLen
-from pydantic import BaseModel, EmailStr, ConfigDict
+from pydantic import AfterValidator, BaseModel, EmailStr, ConfigDict
+
+
+def normalize_email(email: str) -> str:
+    return email.strip().lower()
+
+
+NormalizedEmail = Annotated[EmailStr, AfterValidator(normalize_email)]
 
 
 class CreateUser(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
-    email: EmailStr
+    email: NormalizedEmail
     hashed_password: str
     full_name: Annotated[str, MaxLen(30)]
 
@@ -15,7 +23,7 @@ class CreateUser(BaseModel):
 class ValidateUser(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
-    email: EmailStr
+    email: NormalizedEmail
     hashed_password: str
 
 
@@ -37,6 +45,59 @@ class UserSchema(BaseModel):
     active: bool
 
 
+class CurrentUser(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    email: EmailStr
+    full_name: str | None
+    is_verified: bool
+    roles: list[str]
+
+
+class SessionOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: uuid.UUID
+    created_at: datetime
+    expires_at: datetime
+
+
+class UserFilter(BaseModel):
+    active: bool | None = None
+    is_verified: bool | None = None
+    role: str | None = None
+
+
+class AdminUserOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    email: EmailStr
+    full_name: str | None
+    active: bool
+    is_verified: bool
+    created_at: datetime
+    roles: list[str]
+
+
+class UserPage(BaseModel):
+    items: list[AdminUserOut]
+    next_cursor: str | None = None
+
+
 class PasswordResetRequest(BaseModel):
     token: str
     new_password: str
+
+
+class ImportRowError(BaseModel):
+    line: int
+    error: str
+
+
+class ImportReport(BaseModel):
+    total: int = 0
+    created: int = 0
+    conflicts: list[str] = []
+    invalid: list[ImportRowError] = []
@@ -1,19 +1,33 @@
+import uuid
 from datetime import datetime, timezone
-from typing import Annotated
+from typing import Annotated, Literal
 
 import jwt
-from fastapi import APIRouter, Depends, HTTPException, Body
+from fastapi import APIRouter, Depends, HTTPException, Body, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import status, Response
+from fastapi.responses import StreamingResponse
 
+from core.cache import UserRecord
 from core.config import settings
 from core.utils import send_password_reset_email, reset_password_util, send_verification_email
 from . import schemas as user_schemas
-from core.helpers import create_refresh_token, create_access_token
-from core.schemas import TokenInfo
-from core.validation import validate_auth_user, get_current_active_auth_user_for_refresh, get_current_active_auth_user
-from db.crud import create_user_crud, delete_user_crud, get_user_by_email
-from db.database import get_session
+from core.helpers import create_access_token, ACCESS_TOKEN_TYPE
+from core.revocation import revocation_index
+from core.sessions import refresh_sessions
+from core.bulk_import import import_users, iter_lines
+from core.listing import export_users, list_users
+from core.introspection import introspect_tokens
+from core.mail import mail_queue
+from core.network import require_internal_network
+from core.schemas import TokenInfo, IntrospectionRequest, IntrospectionResponse
+from core.utils import decode_jwt
+from core.validation import validate_auth_user, get_current_active_auth_user_for_refresh, get_current_active_auth_user, \
+    get_current_token_payload, validate_token_type, require_roles
+from db.crud import create_user_crud, delete_user_crud, get_user_record_by_email, get_user_sessions_crud, \
+    verify_email_crud
+from db.database import get_session, get_read_session
+from api.metrics import collect_stats
 from .schemas import UserSchema, PasswordResetRequest
 
 router = APIRouter(
@@ -23,9 +37,12 @@ router = APIRouter(
 
 
 @router.post("/login")
-async def auth_user(user: user_schemas.ValidateUser = Depends(validate_auth_user)):
+async def auth_user(
+        user: user_schemas.ValidateUser = Depends(validate_auth_user),
+        session: AsyncSession = Depends(get_session),
+):
     access_token = create_access_token(user)
-    refresh_token = create_refresh_token(user)
+    refresh_token = await refresh_sessions.start_session(user=user, session=session)
     return TokenInfo(
         access_token=access_token,
         refresh_token=refresh_token,
@@ -37,22 +54,154 @@ async def auth_user(user: user_schemas.ValidateUser = Depends(validate_auth_user
     response_model=TokenInfo,
     response_model_exclude_none=True,
 )
-def auth_refresh_jwt(
+async def auth_refresh_jwt(
+        payload: Annotated[dict, Depends(get_current_token_payload)],
         user: user_schemas.ValidateUser = Depends(get_current_active_auth_user_for_refresh),
+        session: AsyncSession = Depends(get_session),
 ):
+    refresh_token = await refresh_sessions.rotate(user=user, payload=payload, session=session)
     access_token = create_access_token(user)
     return TokenInfo(
         access_token=access_token,
+        refresh_token=refresh_token,
     )
 
 
+@router.get("/me", response_model=user_schemas.CurrentUser)
+def current_user(user: UserRecord = Depends(get_current_active_auth_user)):
+    return user
+
+
+@router.post(
+    "/introspect/batch",
+    response_model=IntrospectionResponse,
+    dependencies=[Depends(require_roles("admin", "service"))],
+)
+async def introspect_batch(
+    introspection_request: IntrospectionRequest,
+    session: AsyncSession = Depends(get_read_session),
+):
+    if len(introspection_request.tokens) > settings.auth_jwt.introspection_max_batch:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.auth_jwt.introspection_max_batch} tokens per request"
+        )
+
+    results = await introspect_tokens(tokens=introspection_request.tokens, session=session)
+    return IntrospectionResponse(results=results)
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(
+    payload: Annotated[dict, Depends(get_current_token_payload)],
+    session: AsyncSession = Depends(get_session),
+    refresh_token: Annotated[str | None, Body(embed=True)] = None,
+):
+    validate_token_type(payload, ACCESS_TOKEN_TYPE)
+    await revocation_index.revoke(payload["jti"], payload["exp"])
+
+    if refresh_token:
+        try:
+            refresh_payload = decode_jwt(refresh_token)
+        except jwt.InvalidTokenError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid refresh token"
+            )
+        if refresh_payload.get("sub") == payload.get("sub"):
+            await revocation_index.revoke(refresh_payload["jti"], refresh_payload["exp"])
+            if "fam" in refresh_payload:
+                await refresh_sessions.revoke(family_id=uuid.UUID(refresh_payload["fam"]), session=session)
+
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+@router.post("/logout/all", status_code=status.HTTP_204_NO_CONTENT)
+async def logout_everywhere(
+    payload: Annotated[dict, Depends(get_current_token_payload)],
+    user: UserRecord = Depends(get_current_active_auth_user),
+    session: AsyncSession = Depends(get_session),
+):
+    await refresh_sessions.revoke_all(user=user, session=session)
+    await revocation_index.revoke(payload["jti"], payload["exp"])
+
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+@router.get("/sessions", response_model=list[user_schemas.SessionOut])
+async def list_sessions(
+    user: UserRecord = Depends(get_current_active_auth_user),
+    session: AsyncSession = Depends(get_read_session),
+):
+    return await get_user_sessions_crud(session=session, user_id=user.id)
+
+
+@router.delete("/sessions/{session_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def revoke_session(
+    session_id: uuid.UUID,
+    user: UserRecord = Depends(get_current_active_auth_user),
+    session: AsyncSession = Depends(get_session),
+):
+    if not await refresh_sessions.revoke(family_id=session_id, user_id=user.id, session=session):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Session not found"
+        )
+
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
 @router.post("/create", response_model=user_schemas.UserOut, status_code=status.HTTP_201_CREATED)
 async def create_user(user: user_schemas.CreateUser, session: AsyncSession = Depends(get_session)):
+    if mail_queue.full():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Mail service is busy, try again later"
+        )
+
     user = await create_user_crud(user_in=user, session=session)
     await send_verification_email(user)
     return user
 
 
+@router.post(
+    "/users/import",
+    response_model=user_schemas.ImportReport,
+    dependencies=[Depends(require_roles("admin"))],
+)
+async def bulk_import_users(
+    request: Request,
+    session: AsyncSession = Depends(get_session),
+    file_format: Annotated[Literal["csv", "ndjson"], Query(alias="format")] = "csv",
+    verified: bool = False,
+):
+    return await import_users(
+        lines=iter_lines(request.stream()),
+        file_format=file_format,
+        session=session,
+        verified=verified,
+    )
+
+
+@router.get(
+    "/admin/users",
+    response_model=user_schemas.UserPage,
+    dependencies=[Depends(require_roles("admin"))],
+)
+async def admin_list_users(
+    user_filter: Annotated[user_schemas.UserFilter, Depends()],
+    session: AsyncSession = Depends(get_read_session),
+    limit: Annotated[int, Query(ge=1, le=settings.admin.page_size_max)] = settings.admin.page_size_default,
+    cursor: str | None = None,
+):
+    return await list_users(session=session, user_filter=user_filter, limit=limit, cursor=cursor)
+
+
+@router.get("/admin/users/export", dependencies=[Depends(require_roles("admin"))])
+async def admin_export_users(user_filter: Annotated[user_schemas.UserFilter, Depends()]):
+    return StreamingResponse(export_users(user_filter), media_type="application/x-ndjson")
+
+
 @router.delete("/delete", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_user(user: UserSchema = Depends(get_current_active_auth_user),
                       session: AsyncSession = Depends(get_session)):
@@ -66,7 +215,7 @@ async def request_password_reset(
     session: Annotated[AsyncSession, Depends(get_session)],
     email: Annotated[str, Body()]
 ):
-    user = await get_user_by_email(session=session, email=email)
+    user = await get_user_record_by_email(session=session, email=email)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -106,21 +255,17 @@ async def verify_email(
             )
 
         email = payload["sub"]
-        user = await get_user_by_email(session=session, email=email)
-        
-        if not user:
+        user = await verify_email_crud(session=session, email=email)
+
+        if user is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="User not found"
             )
-            
+
         if user.is_verified:
             return {"message": "Email already verified"}
-            
-        user.is_verified = True
-        session.add(user)
-        await session.commit()
-        
+
         return {"message": "Email verified successfully"}
         
     except jwt.InvalidTokenError:
@@ -128,3 +273,31 @@ async def verify_email(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid verification token"
         )
+
+
+@router.post("/verify-email/resend", status_code=status.HTTP_202_ACCEPTED)
+async def resend_verification_email(
+    session: Annotated[AsyncSession, Depends(get_session)],
+    email: Annotated[str, Body(embed=True)]
+):
+    user = await get_user_record_by_email(session=session, email=email)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+
+    if user.is_verified:
+        return {"message": "Email already verified"}
+
+    if not await send_verification_email(user):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Mail service is busy, try again later"
+        )
+    return {"message": "Verification email sent"}
+
+
+@router.get("/stats", dependencies=[Depends(require_internal_network)])
+def service_stats():
+    return collect_stats()
@@ -0,0 +1,36 @@
+import hashlib
+import json
+
+from fastapi import APIRouter, Request, Response
+from fastapi import status
+
+from core.config import settings
+from core.keys import key_manager
+
+router = APIRouter(
+    prefix="/.well-known",
+    tags=["Keys"],
+)
+
+_jwks_cache: dict[tuple, tuple[bytes, str]] = {}
+
+
+def jwks_document() -> tuple[bytes, str]:
+    cache_key = tuple(key.kid for key in key_manager.verification_keys())
+    if cache_key not in _jwks_cache:
+        body = json.dumps(key_manager.jwks(), separators=(",", ":")).encode()
+        _jwks_cache.clear()
+        _jwks_cache[cache_key] = body, f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+    return _jwks_cache[cache_key]
+
+
+@router.get("/jwks.json")
+def jwks(request: Request):
+    body, etag = jwks_document()
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={settings.auth_jwt.jwks_max_age_seconds}",
+    }
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1,91 @@
+import json
+import logging
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import jwt
+from jwt import InvalidTokenError, PyJWKSet
+
+logger = logging.getLogger(__name__)
+
+
+class JWKSVerifier:
+    def __init__(
+            self,
+            jwks_url: str,
+            refresh_interval_seconds: float = 300,
+            min_refresh_interval_seconds: float = 10,
+            timeout_seconds: float = 5,
+            leeway_seconds: float = 0,
+    ):
+        self.jwks_url = jwks_url
+        self.refresh_interval_seconds = refresh_interval_seconds
+        self.min_refresh_interval_seconds = min_refresh_interval_seconds
+        self.timeout_seconds = timeout_seconds
+        self.leeway_seconds = leeway_seconds
+        self._keys: dict[str, jwt.PyJWK] = {}
+        self._etag: str | None = None
+        self._fetched_at = 0.0
+        self._lock = threading.Lock()
+        self._refreshing = False
+
+    def refresh(self) -> None:
+        request = urllib.request.Request(self.jwks_url, headers={"Accept": "application/json"})
+        if self._etag:
+            request.add_header("If-None-Match", self._etag)
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout_seconds) as response:
+                jwks = json.loads(response.read())
+                etag = response.headers.get("ETag")
+        except urllib.error.HTTPError as e:
+            if e.code != 304:
+                raise
+        else:
+            self._keys = {key.key_id: key for key in PyJWKSet.from_dict(jwks).keys if key.key_id}
+            self._etag = etag
+        self._fetched_at = time.monotonic()
+
+    def _refresh_in_background(self) -> None:
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def run():
+            try:
+                self.refresh()
+            except Exception:
+                logger.exception("jwks refresh from %s failed", self.jwks_url)
+            finally:
+                self._refreshing = False
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def _key(self, kid: str | None) -> jwt.PyJWK:
+        age = time.monotonic() - self._fetched_at
+        if not self._keys:
+            with self._lock:
+                if not self._keys:
+                    self.refresh()
+        elif age > self.refresh_interval_seconds:
+            self._refresh_in_background()
+
+        if kid in self._keys:
+            return self._keys[kid]
+        if age > self.min_refresh_interval_seconds:
+            with self._lock:
+                self.refresh()
+            if kid in self._keys:
+                return self._keys[kid]
+        raise InvalidTokenError(f"unknown key id {kid!r}")
+
+    def verify(self, token: str | bytes) -> dict:
+        key = self._key(jwt.get_unverified_header(token).get("kid"))
+        return jwt.decode(
+            token,
+            key.key,
+            algorithms=[key.algorithm_name],
+            leeway=self.leeway_seconds,
+        )
@@ -0,0 +1,47 @@
+import argparse
+import asyncio
+from pathlib import Path
+from typing import AsyncIterator
+
+from core.bulk_import import import_users
+from core.hashing import password_hasher
+from core.mail import mail_queue
+from db.database import async_session, dispose_engines, init_engines
+
+
+async def read_lines(path: Path) -> AsyncIterator[str]:
+    with path.open(encoding="utf-8", newline="") as file:
+        for line in file:
+            yield line.rstrip("\n")
+
+
+async def main(path: Path, file_format: str, verified: bool) -> None:
+    init_engines()
+    password_hasher.start()
+    mail_queue.start()
+    try:
+        async with async_session() as session:
+            report = await import_users(
+                lines=read_lines(path),
+                file_format=file_format,
+                session=session,
+                verified=verified,
+            )
+    finally:
+        await mail_queue.stop(timeout=60)
+        password_hasher.shutdown()
+        await dispose_engines()
+    print(report.model_dump_json(indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk import users from a CSV or NDJSON file")
+    parser.add_argument("path", type=Path)
+    parser.add_argument("--format", choices=("csv", "ndjson"), dest="file_format")
+    parser.add_argument("--verified", action="store_true", help="mark imported users as verified and send no mail")
+    args = parser.parse_args()
+    asyncio.run(main(
+        path=args.path,
+        file_format=args.file_format or ("ndjson" if args.path.suffix in (".ndjson", ".jsonl") else "csv"),
+        verified=args.verified,
+    ))
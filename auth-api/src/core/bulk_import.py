@@ -0,0 +1,131 @@
+import codecs
+import csv
+import json
+from typing import AsyncIterator
+
+from pydantic import ValidationError
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.v1.schemas import CreateUser, ImportReport, ImportRowError, UserOut
+from core.config import settings
+from .hashing import password_hasher
+from .utils import send_verification_email
+
+IMPORT_COLUMNS = ("email", "full_name", "hashed_password", "is_verified")
+CREATE_IMPORT_TABLE = """
+    CREATE TEMPORARY TABLE users_import (
+        email varchar NOT NULL,
+        full_name varchar NOT NULL,
+        hashed_password bytea NOT NULL,
+        is_verified boolean NOT NULL
+    ) ON COMMIT DROP
+"""
+INSERT_FROM_IMPORT = """
+    INSERT INTO users (email, full_name, hashed_password, active, is_verified)
+    SELECT email, full_name, hashed_password, true, is_verified FROM users_import
+    ON CONFLICT DO NOTHING
+    RETURNING id, email, full_name, created_at
+"""
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            yield line
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield buffer
+
+
+async def parse_rows(lines: AsyncIterator[str], file_format: str) -> AsyncIterator[tuple[int, dict | None, str | None]]:
+    header = None
+    line_number = 0
+    async for line in lines:
+        line_number += 1
+        line = line.rstrip("\r")
+        if not line.strip():
+            continue
+        if file_format == "ndjson":
+            try:
+                yield line_number, json.loads(line), None
+            except json.JSONDecodeError as e:
+                yield line_number, None, f"invalid json: {e.msg}"
+            continue
+        values = next(csv.reader([line]))
+        if header is None:
+            header = [column.strip() for column in values]
+            continue
+        if len(values) != len(header):
+            yield line_number, None, f"expected {len(header)} columns, got {len(values)}"
+            continue
+        yield line_number, dict(zip(header, values)), None
+
+
+def validate_row(fields: dict) -> CreateUser:
+    return CreateUser(
+        email=fields.get("email"),
+        hashed_password=fields.get("password") or fields.get("hashed_password"),
+        full_name=fields.get("full_name"),
+    )
+
+
+async def copy_users(session: AsyncSession, records: list[tuple]) -> list:
+    await session.execute(text(CREATE_IMPORT_TABLE))
+    connection = await session.connection()
+    raw_connection = await connection.get_raw_connection()
+    driver_connection = raw_connection.driver_connection
+    await driver_connection.copy_records_to_table("users_import", records=records, columns=IMPORT_COLUMNS)
+    rows = await driver_connection.fetch(INSERT_FROM_IMPORT)
+    await session.commit()
+    return rows
+
+
+def add_error(report: ImportReport, line: int, error: str) -> None:
+    if len(report.invalid) < settings.bulk_import.max_reported_errors:
+        report.invalid.append(ImportRowError(line=line, error=error))
+
+
+async def import_chunk(chunk: list[CreateUser], session: AsyncSession, verified: bool, report: ImportReport):
+    hashed_passwords = await password_hasher.hash_many([user.hashed_password for user in chunk])
+    records = [
+        (user.email, user.full_name, hashed_password, verified)
+        for user, hashed_password in zip(chunk, hashed_passwords)
+    ]
+    rows = await copy_users(session, records)
+
+    created = {row["email"] for row in rows}
+    report.created += len(created)
+    for user in chunk:
+        if user.email not in created and len(report.conflicts) < settings.bulk_import.max_reported_errors:
+            report.conflicts.append(user.email)
+        created.discard(user.email)
+
+    if not verified:
+        for row in rows:
+            await send_verification_email(UserOut.model_validate(dict(row)), wait=True)
+
+
+async def import_users(lines: AsyncIterator[str], file_format: str, session: AsyncSession,
+                       verified: bool = False) -> ImportReport:
+    report = ImportReport()
+    chunk: list[CreateUser] = []
+    async for line_number, fields, error in parse_rows(lines, file_format):
+        report.total += 1
+        if error is None:
+            try:
+                chunk.append(validate_row(fields))
+            except ValidationError as e:
+                error = "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+        if error is not None:
+            add_error(report, line_number, error)
+        if len(chunk) >= settings.bulk_import.chunk_size:
+            await import_chunk(chunk, session, verified, report)
+            chunk = []
+    if chunk:
+        await import_chunk(chunk, session, verified, report)
+    return report
@@ -0,0 +1,174 @@
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+from core.config import settings
+
+
+class UserRecord:
+    __slots__ = ("id", "email", "full_name", "active", "is_verified", "created_at", "token_version", "roles",
+                 "role_mask")
+
+    def __init__(self, id: int, email: str, full_name: str | None, active: bool, is_verified: bool,
+                 created_at: datetime | None, token_version: int = 0, roles: tuple[str, ...] = (),
+                 role_mask: int = 0):
+        self.id = id
+        self.email = email
+        self.full_name = full_name
+        self.active = active
+        self.is_verified = is_verified
+        self.created_at = created_at
+        self.token_version = token_version
+        self.roles = roles
+        self.role_mask = role_mask
+
+    @classmethod
+    def from_row(cls, row) -> "UserRecord":
+        role_mask = 0
+        for role_id in row.role_ids or ():
+            role_mask |= 1 << role_id
+        return cls(
+            id=row.id,
+            email=row.email,
+            full_name=row.full_name,
+            active=row.active,
+            is_verified=row.is_verified,
+            created_at=row.created_at,
+            token_version=row.token_version,
+            roles=tuple(row.role_titles or ()),
+            role_mask=role_mask,
+        )
+
+    @classmethod
+    def from_claims(cls, payload: dict) -> "UserRecord":
+        return cls(
+            id=payload["uid"],
+            email=payload["sub"],
+            full_name=payload.get("name"),
+            active=payload["active"],
+            is_verified=payload["verified"],
+            created_at=None,
+            token_version=payload["ver"],
+            roles=tuple(payload.get("roles", ())),
+            role_mask=payload.get("rmask", 0),
+        )
+
+
+class UserCache:
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._by_email: OrderedDict[str, tuple[float, UserRecord]] = OrderedDict()
+        self._email_by_id: dict[int, str] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._by_email)
+
+    def get_by_email(self, email: str) -> UserRecord | None:
+        entry = self._by_email.get(email)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, record = entry
+        if expires_at < time.monotonic():
+            self._remove(email)
+            self.misses += 1
+            return None
+        self._by_email.move_to_end(email)
+        self.hits += 1
+        return record
+
+    def get_by_id(self, user_id: int) -> UserRecord | None:
+        if (email := self._email_by_id.get(user_id)) is None:
+            self.misses += 1
+            return None
+        return self.get_by_email(email)
+
+    def put(self, record: UserRecord) -> UserRecord:
+        if self.max_size <= 0:
+            return record
+        self._by_email[record.email] = (time.monotonic() + self.ttl_seconds, record)
+        self._by_email.move_to_end(record.email)
+        self._email_by_id[record.id] = record.email
+        while len(self._by_email) > self.max_size:
+            email, (_, evicted) = self._by_email.popitem(last=False)
+            self._email_by_id.pop(evicted.id, None)
+            self.evictions += 1
+        return record
+
+    def invalidate(self, email: str | None = None, user_id: int | None = None) -> None:
+        if email is None and user_id is not None:
+            email = self._email_by_id.get(user_id)
+        if email is not None and self._remove(email):
+            self.invalidations += 1
+
+    def _remove(self, email: str) -> bool:
+        entry = self._by_email.pop(email, None)
+        if entry is None:
+            return False
+        self._email_by_id.pop(entry[1].id, None)
+        return True
+
+    def clear(self) -> None:
+        self._by_email.clear()
+        self._email_by_id.clear()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._by_email),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+class RecentEmails:
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._expires: OrderedDict[str, float] = OrderedDict()
+        self.hits = 0
+
+    def __contains__(self, email: str) -> bool:
+        expires_at = self._expires.get(email)
+        if expires_at is None:
+            return False
+        if expires_at < time.monotonic():
+            del self._expires[email]
+            return False
+        self.hits += 1
+        return True
+
+    def add(self, email: str) -> None:
+        if self.max_size <= 0:
+            return
+        self._expires[email] = time.monotonic() + self.ttl_seconds
+        self._expires.move_to_end(email)
+        while len(self._expires) > self.max_size:
+            self._expires.popitem(last=False)
+
+    def discard(self, email: str) -> None:
+        self._expires.pop(email, None)
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._expires),
+            "max_size": self.max_size,
+            "hits": self.hits,
+        }
+
+
+user_cache = UserCache(
+    max_size=settings.cache.user_cache_size,
+    ttl_seconds=settings.cache.user_cache_ttl_seconds,
+)
+recent_emails = RecentEmails(
+    max_size=settings.cache.recent_emails_size,
+    ttl_seconds=settings.cache.recent_emails_ttl_seconds,
+)
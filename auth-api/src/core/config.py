@@ -16,20 +16,46 @@ class DbSettings(BaseModel):
     db_name: str = os.getenv('DB_NAME')
     db_user: str = os.getenv('DB_USER')
     db_pass: str = os.getenv('DB_PASS')
+    db_replica_host: str | None = os.getenv('DB_REPLICA_HOST')
+    db_replica_port: str = os.getenv('DB_REPLICA_PORT', os.getenv('DB_PORT'))
+
+    db_pool_size: int = int(os.getenv('DB_POOL_SIZE', 10))
+    db_max_overflow: int = int(os.getenv('DB_MAX_OVERFLOW', 10))
+    db_pool_timeout: float = float(os.getenv('DB_POOL_TIMEOUT', 10))
+    db_pool_recycle: int = int(os.getenv('DB_POOL_RECYCLE', 1800))
+    db_pool_pre_ping: bool = os.getenv('DB_POOL_PRE_PING', 'true').lower() == 'true'
+    db_pool_warmup: int = int(os.getenv('DB_POOL_WARMUP', os.getenv('DB_POOL_SIZE', 10)))
+    db_statement_cache_size: int = int(os.getenv('DB_STATEMENT_CACHE_SIZE', 500))
 
 
 class AuthJWTSettings(BaseModel):
-    private_key_path: Path = BASE_DIR / "certs" / "jwt-private.pem"
-    public_key_path: Path = BASE_DIR / "certs" / "jwt-public.pem"
+    private_key_path: Path = Path(os.environ.get("JWT_PRIVATE_KEY_PATH", BASE_DIR / "certs" / "jwt-private.pem"))
+    public_key_path: Path = Path(os.environ.get("JWT_PUBLIC_KEY_PATH", BASE_DIR / "certs" / "jwt-public.pem"))
+    verification_keys_dir: Path = Path(os.environ.get("JWT_VERIFICATION_KEYS_DIR", BASE_DIR / "certs" / "verification"))
+    key_reload_interval_seconds: float = float(os.environ.get("JWT_KEY_RELOAD_INTERVAL_SECONDS", 60))
+    jwks_max_age_seconds: int = int(os.environ.get("JWKS_MAX_AGE_SECONDS", 300))
     algorithm: str = os.environ.get("ALGORITHM")
     access_token_expire_minutes: int = os.environ.get("ACCESS_TOKEN_EXPIRE_MINUTES")
     refresh_token_expire_days: int = os.environ.get("REFRESH_TOKEN_EXPIRE_DAYS")
+    stateless_access_tokens: bool = os.environ.get("STATELESS_ACCESS_TOKENS", "false").lower() == "true"
+    stateless_trust_seconds: int = int(os.environ.get("STATELESS_TRUST_SECONDS", 60))
+    introspection_max_batch: int = int(os.environ.get("INTROSPECTION_MAX_BATCH", 500))
 
 
 class SMTPSettings(BaseModel):
+    smtp_host: str = os.environ.get("SMTP_HOST", "smtp.gmail.com")
+    smtp_port: int = int(os.environ.get("SMTP_PORT", 465))
+    smtp_use_ssl: bool = os.environ.get("SMTP_USE_SSL", "true").lower() == "true"
     smtp_user: str = os.environ.get("SMTP_USER")
     smtp_pass: str = os.environ.get("SMTP_PASS")
 
+    mail_transport: str = os.environ.get("MAIL_TRANSPORT", "smtp")
+    mail_workers: int = int(os.environ.get("MAIL_WORKERS", 2))
+    mail_queue_size: int = int(os.environ.get("MAIL_QUEUE_SIZE", 1000))
+    mail_batch_size: int = int(os.environ.get("MAIL_BATCH_SIZE", 20))
+    mail_max_retries: int = int(os.environ.get("MAIL_MAX_RETRIES", 5))
+    mail_retry_backoff_seconds: float = float(os.environ.get("MAIL_RETRY_BACKOFF_SECONDS", 2))
+
     reset_password_token_expire_minutes: int = int(os.environ.get("RESET_PASSWORD_TOKEN_EXPIRE_MINUTES"))
     reset_password_email_template: str = os.environ.get("RESET_PASSWORD_EMAIL_TEMPLATE")
     reset_password_secret_key: str = os.environ.get("RESET_PASSWORD_SECRET_KEY")
@@ -41,10 +67,90 @@ class SMTPSettings(BaseModel):
     email_verification_algorithm: str = os.environ.get("EMAIL_VERIFICATION_ALGORITHM")
 
 
+class HashingSettings(BaseModel):
+    workers: int = int(os.environ.get("PASSWORD_HASH_WORKERS", os.cpu_count() or 1))
+    max_queue: int = int(os.environ.get("PASSWORD_HASH_MAX_QUEUE", 64))
+    timeout_seconds: float = float(os.environ.get("PASSWORD_HASH_TIMEOUT_SECONDS", 5))
+    scheme: str = os.environ.get("PASSWORD_HASH_SCHEME", "bcrypt")
+    bcrypt_rounds: int = int(os.environ.get("PASSWORD_HASH_BCRYPT_ROUNDS", 12))
+    argon2_time_cost: int = int(os.environ.get("PASSWORD_HASH_ARGON2_TIME_COST", 3))
+    argon2_memory_kib: int = int(os.environ.get("PASSWORD_HASH_ARGON2_MEMORY_KIB", 65536))
+    argon2_parallelism: int = int(os.environ.get("PASSWORD_HASH_ARGON2_PARALLELISM", 1))
+    target_ms: float = float(os.environ.get("PASSWORD_HASH_TARGET_MS", 0))
+    min_bcrypt_rounds: int = int(os.environ.get("PASSWORD_HASH_MIN_BCRYPT_ROUNDS", 10))
+    max_bcrypt_rounds: int = int(os.environ.get("PASSWORD_HASH_MAX_BCRYPT_ROUNDS", 15))
+    max_argon2_time_cost: int = int(os.environ.get("PASSWORD_HASH_MAX_ARGON2_TIME_COST", 10))
+    rehash_on_login: bool = os.environ.get("PASSWORD_REHASH_ON_LOGIN", "true").lower() == "true"
+
+
+class CacheSettings(BaseModel):
+    user_cache_size: int = int(os.environ.get("USER_CACHE_SIZE", 10000))
+    user_cache_ttl_seconds: float = float(os.environ.get("USER_CACHE_TTL_SECONDS", 30))
+    recent_emails_size: int = int(os.environ.get("RECENT_EMAILS_SIZE", 50000))
+    recent_emails_ttl_seconds: float = float(os.environ.get("RECENT_EMAILS_TTL_SECONDS", 600))
+    role_table_reload_interval_seconds: float = float(os.environ.get("ROLE_TABLE_RELOAD_INTERVAL_SECONDS", 60))
+
+
+class RevocationSettings(BaseModel):
+    bloom_capacity: int = int(os.environ.get("REVOCATION_BLOOM_CAPACITY", 100000))
+    bloom_error_rate: float = float(os.environ.get("REVOCATION_BLOOM_ERROR_RATE", 0.001))
+    refresh_interval_seconds: float = float(os.environ.get("REVOCATION_REFRESH_INTERVAL_SECONDS", 5))
+    purge_interval_seconds: float = float(os.environ.get("REVOCATION_PURGE_INTERVAL_SECONDS", 3600))
+
+
+class BulkImportSettings(BaseModel):
+    chunk_size: int = int(os.environ.get("BULK_IMPORT_CHUNK_SIZE", 1000))
+    max_reported_errors: int = int(os.environ.get("BULK_IMPORT_MAX_REPORTED_ERRORS", 1000))
+
+
+class MaintenanceSettings(BaseModel):
+    enabled: bool = os.environ.get("MAINTENANCE_ENABLED", "true").lower() == "true"
+    tick_seconds: float = float(os.environ.get("MAINTENANCE_TICK_SECONDS", 30))
+    lock_id: int = int(os.environ.get("MAINTENANCE_LOCK_ID", 720_431_001))
+    batch_size: int = int(os.environ.get("MAINTENANCE_BATCH_SIZE", 1000))
+    batch_pause_seconds: float = float(os.environ.get("MAINTENANCE_BATCH_PAUSE_SECONDS", 0.2))
+    analyze_threshold: int = int(os.environ.get("MAINTENANCE_ANALYZE_THRESHOLD", 10000))
+    unverified_user_max_age_hours: float = float(os.environ.get("UNVERIFIED_USER_MAX_AGE_HOURS", 72))
+    unverified_users_interval_seconds: float = float(os.environ.get("PURGE_UNVERIFIED_USERS_INTERVAL_SECONDS", 3600))
+    refresh_sessions_interval_seconds: float = float(os.environ.get("PURGE_REFRESH_SESSIONS_INTERVAL_SECONDS", 3600))
+
+
+class ThrottleSettings(BaseModel):
+    backend: str = os.environ.get("LOGIN_THROTTLE_BACKEND", "memory")
+    redis_url: str = os.environ.get("LOGIN_THROTTLE_REDIS_URL", "redis://localhost:6379/0")
+    window_seconds: int = int(os.environ.get("LOGIN_THROTTLE_WINDOW_SECONDS", 60))
+    max_per_email: int = int(os.environ.get("LOGIN_THROTTLE_MAX_PER_EMAIL", 10))
+    max_per_ip: int = int(os.environ.get("LOGIN_THROTTLE_MAX_PER_IP", 100))
+    max_keys: int = int(os.environ.get("LOGIN_THROTTLE_MAX_KEYS", 100000))
+
+
+class NetworkSettings(BaseModel):
+    trusted_proxies: list[str] = [
+        proxy.strip() for proxy in os.environ.get("TRUSTED_PROXIES", "").split(",") if proxy.strip()
+    ]
+    internal_networks: list[str] = [
+        network.strip() for network in os.environ.get("INTERNAL_NETWORKS", "").split(",") if network.strip()
+    ]
+
+
+class AdminSettings(BaseModel):
+    page_size_default: int = int(os.environ.get("ADMIN_PAGE_SIZE_DEFAULT", 50))
+    page_size_max: int = int(os.environ.get("ADMIN_PAGE_SIZE_MAX", 500))
+    export_batch_size: int = int(os.environ.get("ADMIN_EXPORT_BATCH_SIZE", 1000))
+
+
 class Settings(BaseSettings):
     db: DbSettings = DbSettings()
     smtp: SMTPSettings = SMTPSettings()
     auth_jwt: AuthJWTSettings = AuthJWTSettings()
+    hashing: HashingSettings = HashingSettings()
+    cache: CacheSettings = CacheSettings()
+    revocation: RevocationSettings = RevocationSettings()
+    bulk_import: BulkImportSettings = BulkImportSettings()
+    throttle: ThrottleSettings = ThrottleSettings()
+    maintenance: MaintenanceSettings = MaintenanceSettings()
+    admin: AdminSettings = AdminSettings()
+    network: NetworkSettings = NetworkSettings()
 
 
 settings = Settings()
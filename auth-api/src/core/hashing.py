@@ -0,0 +1,132 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from fastapi import HTTPException
+from starlette import status
+
+from core.config import settings
+from core.metrics import stage_duration
+from . import passwords as password_utils
+from .passwords import HashPolicy, default_policy
+
+logger = logging.getLogger(__name__)
+
+
+class PasswordHasher:
+    def __init__(self, workers: int, max_queue: int, timeout_seconds: float, policy: HashPolicy):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.timeout_seconds = timeout_seconds
+        self.policy = policy
+        self._executor: ProcessPoolExecutor | None = None
+        self.in_flight = 0
+        self.bulk_in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.busy_seconds = 0.0
+        self.rehashed = 0
+
+    @property
+    def queue_depth(self) -> int:
+        return max(0, self.in_flight - self.workers)
+
+    def start(self) -> None:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    async def _run(self, func, *args, bounded: bool = True):
+        if bounded and self.in_flight >= self.workers + self.max_queue:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="password hashing queue is full",
+            )
+        self.start()
+        if bounded:
+            self.in_flight += 1
+        else:
+            self.bulk_in_flight += 1
+        started = time.perf_counter()
+        future = asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+        try:
+            return await asyncio.wait_for(future, timeout=self.timeout_seconds if bounded else None)
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="password hashing timed out",
+            )
+        finally:
+            elapsed = time.perf_counter() - started
+            if bounded:
+                self.in_flight -= 1
+            else:
+                self.bulk_in_flight -= 1
+            self.completed += 1
+            self.busy_seconds += elapsed
+            stage_duration.observe(elapsed, func.__name__)
+
+    async def calibrate(self, target_ms: float) -> HashPolicy:
+        self.policy = await self._run(
+            password_utils.calibrate,
+            self.policy,
+            target_ms,
+            settings.hashing.min_bcrypt_rounds,
+            settings.hashing.max_bcrypt_rounds,
+            settings.hashing.max_argon2_time_cost,
+            bounded=False,
+        )
+        logger.info("calibrated %s password hashing to cost %s for %sms", self.policy.scheme,
+                    self.policy.cost, target_ms)
+        return self.policy
+
+    async def hash(self, password: str) -> bytes:
+        return await self._run(password_utils.hash_password, password, self.policy)
+
+    async def verify(self, password: str, hashed_password: bytes) -> bool:
+        return await self._run(password_utils.validate_password, password, hashed_password)
+
+    def needs_rehash(self, hashed_password: bytes) -> bool:
+        return password_utils.needs_rehash(hashed_password, self.policy)
+
+    async def hash_many(self, passwords: list[str], slice_size: int = 16) -> list[bytes]:
+        limit = asyncio.Semaphore(max(1, self.workers - 1))
+
+        async def hash_slice(passwords_slice: list[str]) -> list[bytes]:
+            async with limit:
+                return await self._run(password_utils.hash_passwords, passwords_slice, self.policy, bounded=False)
+
+        slices = [passwords[i:i + slice_size] for i in range(0, len(passwords), slice_size)]
+        results = await asyncio.gather(*(hash_slice(passwords_slice) for passwords_slice in slices))
+        return [hashed for result in results for hashed in result]
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "scheme": self.policy.scheme,
+            "cost": self.policy.cost,
+            "in_flight": self.in_flight,
+            "bulk_in_flight": self.bulk_in_flight,
+            "queue_depth": self.queue_depth,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "busy_seconds": round(self.busy_seconds, 3),
+            "rehashed": self.rehashed,
+        }
+
+
+password_hasher = PasswordHasher(
+    workers=settings.hashing.workers,
+    max_queue=settings.hashing.max_queue,
+    timeout_seconds=settings.hashing.timeout_seconds,
+    policy=default_policy,
+)
@@ -1,4 +1,5 @@
-from datetime import timedelta
+import uuid
+from datetime import datetime, timedelta, UTC
 
 from . import utils as auth_utils
 from core.config import settings
@@ -25,11 +26,25 @@ def create_jwt(
     )
 
 
+def user_claims(user) -> dict:
+    return {
+        "uid": user.id,
+        "name": user.full_name,
+        "active": user.active,
+        "verified": user.is_verified,
+        "roles": list(user.roles),
+        "rmask": user.role_mask,
+        "ver": user.token_version,
+    }
+
+
 def create_access_token(user: ValidateUser) -> str:
     jwt_payload = {
         "sub": user.email,
         "email": user.email,
     }
+    if settings.auth_jwt.stateless_access_tokens:
+        jwt_payload.update(user_claims(user))
     return create_jwt(
         token_type=ACCESS_TOKEN_TYPE,
         token_data=jwt_payload,
@@ -37,12 +52,22 @@ def create_access_token(user: ValidateUser) -> str:
     )
 
 
-def create_refresh_token(user: ValidateUser) -> str:
+def create_refresh_token(
+    user: ValidateUser,
+    family_id: uuid.UUID | None = None,
+    jti: str | None = None,
+    expires_at: datetime | None = None,
+) -> str:
     jwt_payload = {
         "sub": user.email,
     }
+    if family_id is not None:
+        jwt_payload.update(fam=str(family_id), jti=jti)
+    expire_timedelta = timedelta(days=int(settings.auth_jwt.refresh_token_expire_days))
+    if expires_at is not None:
+        expire_timedelta = expires_at.replace(tzinfo=UTC) - datetime.now(UTC)
     return create_jwt(
         token_type=REFRESH_TOKEN_TYPE,
         token_data=jwt_payload,
-        expire_timedelta=timedelta(days=int(settings.auth_jwt.refresh_token_expire_days)),
+        expire_timedelta=expire_timedelta,
     )
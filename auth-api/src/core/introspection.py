@@ -0,0 +1,66 @@
+from jwt import InvalidTokenError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.crud import get_user_records_by_emails
+from . import utils as auth_utils
+from .cache import UserRecord, user_cache
+from .helpers import TOKEN_TYPE_FIELD
+from .revocation import revocation_index
+from .schemas import TokenIntrospection
+
+
+def decode_token(token: str) -> tuple[dict | None, str | None]:
+    try:
+        payload = auth_utils.decode_jwt(token=token)
+    except InvalidTokenError as e:
+        return None, f"invalid token error: {e}"
+    if revocation_index.is_revoked(payload.get("jti")):
+        return None, "token revoked"
+    return payload, None
+
+
+async def resolve_users(emails: set[str], session: AsyncSession) -> dict[str, UserRecord]:
+    users = {}
+    missing = []
+    for email in emails:
+        if user := user_cache.get_by_email(email):
+            users[email] = user
+        else:
+            missing.append(email)
+    if missing:
+        for user in await get_user_records_by_emails(emails=missing, session=session):
+            users[user.email] = user_cache.put(user)
+    return users
+
+
+def introspect_payload(payload: dict, user: UserRecord | None) -> TokenIntrospection:
+    result = TokenIntrospection(
+        active=False,
+        token_type=payload.get(TOKEN_TYPE_FIELD),
+        sub=payload.get("sub"),
+        claims=payload,
+    )
+    if user is None:
+        result.error = "user not found"
+    elif not user.active:
+        result.error = "user inactive"
+    elif "ver" in payload and payload["ver"] != user.token_version:
+        result.error = "token version outdated"
+    else:
+        result.active = True
+        result.user_id = user.id
+    return result
+
+
+async def introspect_tokens(tokens: list[str], session: AsyncSession) -> list[TokenIntrospection]:
+    decoded = [decode_token(token) for token in tokens]
+    emails = {payload["sub"] for payload, _ in decoded if payload and payload.get("sub")}
+    users = await resolve_users(emails, session) if emails else {}
+
+    results = []
+    for payload, error in decoded:
+        if payload is None:
+            results.append(TokenIntrospection(active=False, error=error))
+        else:
+            results.append(introspect_payload(payload, users.get(payload.get("sub"))))
+    return results
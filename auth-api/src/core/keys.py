@@ -0,0 +1,158 @@
+import base64
+import hashlib
+import json
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from cryptography.hazmat.primitives.asymmetric import ec, ed448, ed25519, rsa
+from cryptography.hazmat.primitives.serialization import load_pem_private_key, load_pem_public_key
+from jwt import InvalidTokenError
+from jwt.algorithms import ECAlgorithm, OKPAlgorithm, RSAAlgorithm
+
+from core.config import settings
+
+THUMBPRINT_MEMBERS = {
+    "RSA": ("e", "kty", "n"),
+    "EC": ("crv", "kty", "x", "y"),
+    "OKP": ("crv", "kty", "x"),
+}
+EC_CURVE_ALGORITHMS = {
+    "secp256r1": "ES256",
+    "secp384r1": "ES384",
+    "secp521r1": "ES512",
+}
+
+
+@dataclass(frozen=True, slots=True)
+class JWTKey:
+    kid: str
+    algorithm: str
+    public_key: object
+    private_key: object | None = None
+
+
+def public_jwk(public_key) -> dict:
+    if isinstance(public_key, rsa.RSAPublicKey):
+        return RSAAlgorithm.to_jwk(public_key, as_dict=True)
+    if isinstance(public_key, ec.EllipticCurvePublicKey):
+        return ECAlgorithm.to_jwk(public_key, as_dict=True)
+    if isinstance(public_key, (ed25519.Ed25519PublicKey, ed448.Ed448PublicKey)):
+        return OKPAlgorithm.to_jwk(public_key, as_dict=True)
+    raise ValueError(f"unsupported key type {type(public_key).__name__}")
+
+
+def jwk_thumbprint(jwk: dict) -> str:
+    members = {name: jwk[name] for name in THUMBPRINT_MEMBERS[jwk["kty"]]}
+    digest = hashlib.sha256(json.dumps(members, separators=(",", ":"), sort_keys=True).encode()).digest()
+    return base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
+
+
+def key_algorithm(public_key, preferred: str) -> str:
+    if isinstance(public_key, rsa.RSAPublicKey):
+        return preferred if preferred[:2] in ("RS", "PS") else "RS256"
+    if isinstance(public_key, ec.EllipticCurvePublicKey):
+        return EC_CURVE_ALGORITHMS[public_key.curve.name]
+    if isinstance(public_key, (ed25519.Ed25519PublicKey, ed448.Ed448PublicKey)):
+        return "EdDSA"
+    raise ValueError(f"unsupported key type {type(public_key).__name__}")
+
+
+class JWTKeyManager:
+    def __init__(
+            self,
+            private_key_path: Path,
+            public_key_path: Path,
+            verification_keys_dir: Path,
+            algorithm: str,
+            reload_interval_seconds: float,
+    ):
+        self.private_key_path = private_key_path
+        self.public_key_path = public_key_path
+        self.verification_keys_dir = verification_keys_dir
+        self.algorithm = algorithm
+        self.reload_interval_seconds = reload_interval_seconds
+        self._signing_key: JWTKey | None = None
+        self._verification_keys: dict[str, JWTKey] = {}
+        self._files_state: tuple = ()
+        self._next_check = 0.0
+
+    def _key_files(self) -> list[Path]:
+        files = [self.private_key_path, self.public_key_path]
+        if self.verification_keys_dir.is_dir():
+            files.extend(sorted(self.verification_keys_dir.glob("*.pem")))
+        return files
+
+    def _current_files_state(self) -> tuple:
+        return tuple((path, path.stat().st_mtime_ns) for path in self._key_files() if path.exists())
+
+    def load(self) -> None:
+        files_state = self._current_files_state()
+        private_key = load_pem_private_key(self.private_key_path.read_bytes(), password=None)
+        public_key = private_key.public_key()
+        if key_algorithm(public_key, self.algorithm) != self.algorithm:
+            raise ValueError(f"{self.private_key_path} cannot be used with algorithm {self.algorithm}")
+        signing_key = JWTKey(
+            kid=jwk_thumbprint(public_jwk(public_key)),
+            algorithm=self.algorithm,
+            public_key=public_key,
+            private_key=private_key,
+        )
+
+        verification_keys = {signing_key.kid: signing_key}
+        for path in self._key_files()[1:]:
+            if not path.exists():
+                continue
+            key = load_pem_public_key(path.read_bytes())
+            kid = jwk_thumbprint(public_jwk(key))
+            verification_keys.setdefault(kid, JWTKey(kid=kid, algorithm=key_algorithm(key, self.algorithm), public_key=key))
+
+        self._signing_key = signing_key
+        self._verification_keys = verification_keys
+        self._files_state = files_state
+        self._next_check = time.monotonic() + self.reload_interval_seconds
+
+    def _refresh(self, force: bool = False) -> None:
+        now = time.monotonic()
+        if self._signing_key is None:
+            self.load()
+        elif now >= self._next_check or force:
+            self._next_check = now + self.reload_interval_seconds
+            if self._current_files_state() != self._files_state:
+                self.load()
+
+    def signing_key(self) -> JWTKey:
+        self._refresh()
+        return self._signing_key
+
+    def verification_key(self, kid: str | None) -> JWTKey:
+        self._refresh()
+        if kid is None:
+            return self._signing_key
+        if (key := self._verification_keys.get(kid)) is None:
+            self._refresh(force=True)
+            key = self._verification_keys.get(kid)
+        if key is None:
+            raise InvalidTokenError(f"unknown key id {kid!r}")
+        return key
+
+    def verification_keys(self) -> list[JWTKey]:
+        self._refresh()
+        return list(self._verification_keys.values())
+
+    def jwks(self) -> dict:
+        return {
+            "keys": [
+                {**public_jwk(key.public_key), "kid": key.kid, "alg": key.algorithm, "use": "sig"}
+                for key in self.verification_keys()
+            ]
+        }
+
+
+key_manager = JWTKeyManager(
+    private_key_path=settings.auth_jwt.private_key_path,
+    public_key_path=settings.auth_jwt.public_key_path,
+    verification_keys_dir=settings.auth_jwt.verification_keys_dir,
+    algorithm=settings.auth_jwt.algorithm,
+    reload_interval_seconds=settings.auth_jwt.key_reload_interval_seconds,
+)
@@ -0,0 +1,63 @@
+import base64
+import binascii
+import datetime
+import json
+from typing import AsyncIterator
+
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette import status
+
+from api.v1.schemas import AdminUserOut, UserFilter, UserPage
+from core.config import settings
+from db import queries
+from db.crud import list_users_crud
+from db.database import async_read_session
+
+
+def encode_cursor(row) -> str:
+    raw = f"{row.created_at.isoformat()}|{row.id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime.datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, user_id = raw.split("|")
+        return datetime.datetime.fromisoformat(created_at), int(user_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+def user_row(row) -> dict:
+    return {
+        "id": row.id,
+        "email": row.email,
+        "full_name": row.full_name,
+        "active": row.active,
+        "is_verified": row.is_verified,
+        "created_at": row.created_at.isoformat(),
+        "roles": row.roles or [],
+    }
+
+
+async def list_users(session: AsyncSession, user_filter: UserFilter, limit: int, cursor: str | None) -> UserPage:
+    after = decode_cursor(cursor) if cursor else None
+    rows = await list_users_crud(session=session, user_filter=user_filter, limit=limit + 1, after=after)
+    page = UserPage(items=[AdminUserOut.model_validate(user_row(row)) for row in rows[:limit]])
+    if len(rows) > limit:
+        page.next_cursor = encode_cursor(rows[limit - 1])
+    return page
+
+
+async def export_users(user_filter: UserFilter) -> AsyncIterator[bytes]:
+    query = queries.admin_users(**user_filter.model_dump()).execution_options(
+        yield_per=settings.admin.export_batch_size
+    )
+    async with async_read_session() as session:
+        result = await session.stream(query)
+        async for rows in result.partitions():
+            yield "".join(json.dumps(user_row(row)) + "\n" for row in rows).encode()
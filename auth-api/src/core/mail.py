@@ -0,0 +1,236 @@
+import asyncio
+import logging
+import smtplib
+import time
+from dataclasses import dataclass
+from email.message import Message
+from typing import Callable
+
+from core.config import settings
+from core.metrics import stage_duration
+
+logger = logging.getLogger(__name__)
+
+
+class MailTransport:
+    def send_batch(self, messages: list[Message]) -> list[Message]:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class NullTransport(MailTransport):
+    def __init__(self):
+        self.sent = 0
+
+    def send_batch(self, messages: list[Message]) -> list[Message]:
+        self.sent += len(messages)
+        for message in messages:
+            logger.info("mail to %s dropped by null transport: %s", message["To"], message["Subject"])
+        return []
+
+
+class SMTPTransport(MailTransport):
+    def __init__(self, host: str, port: int, user: str | None, password: str | None,
+                 use_ssl: bool = True, timeout: float = 30):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.use_ssl = use_ssl
+        self.timeout = timeout
+        self._smtp: smtplib.SMTP | None = None
+
+    def _connect(self) -> smtplib.SMTP:
+        smtp_class = smtplib.SMTP_SSL if self.use_ssl else smtplib.SMTP
+        smtp = smtp_class(self.host, self.port, timeout=self.timeout)
+        if self.user:
+            smtp.login(self.user, self.password)
+        return smtp
+
+    def _connection(self) -> smtplib.SMTP:
+        if self._smtp is not None:
+            try:
+                self._smtp.noop()
+            except (smtplib.SMTPException, OSError):
+                self.close()
+        if self._smtp is None:
+            self._smtp = self._connect()
+        return self._smtp
+
+    def send_batch(self, messages: list[Message]) -> list[Message]:
+        try:
+            smtp = self._connection()
+        except (smtplib.SMTPException, OSError):
+            logger.exception("smtp connection to %s:%s failed", self.host, self.port)
+            return messages
+
+        for sent, message in enumerate(messages):
+            try:
+                smtp.send_message(message)
+            except (smtplib.SMTPServerDisconnected, OSError):
+                logger.exception("smtp connection lost")
+                self.close()
+                return messages[sent:]
+            except smtplib.SMTPException:
+                logger.exception("smtp rejected mail to %s", message["To"])
+                return [message] + self.send_batch(messages[sent + 1:])
+        return []
+
+    def close(self) -> None:
+        if self._smtp is None:
+            return
+        try:
+            self._smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            pass
+        self._smtp = None
+
+
+def smtp_transport_factory() -> MailTransport:
+    if settings.smtp.mail_transport == "null":
+        return NullTransport()
+    return SMTPTransport(
+        host=settings.smtp.smtp_host,
+        port=settings.smtp.smtp_port,
+        user=settings.smtp.smtp_user,
+        password=settings.smtp.smtp_pass,
+        use_ssl=settings.smtp.smtp_use_ssl,
+    )
+
+
+@dataclass
+class Envelope:
+    message: Message
+    attempts: int = 0
+
+
+class MailQueue:
+    def __init__(
+            self,
+            transport_factory: Callable[[], MailTransport],
+            workers: int,
+            max_size: int,
+            batch_size: int,
+            max_retries: int,
+            retry_backoff_seconds: float,
+    ):
+        self.transport_factory = transport_factory
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.retry_backoff_seconds = retry_backoff_seconds
+        self._queue: asyncio.Queue[Envelope] = asyncio.Queue(maxsize=max_size)
+        self._tasks: list[asyncio.Task] = []
+        self._retries: set[asyncio.Task] = set()
+        self.sent = 0
+        self.retried = 0
+        self.dropped = 0
+        self.rejected = 0
+
+    def start(self) -> None:
+        if self._tasks:
+            return
+        self._tasks = [
+            asyncio.create_task(self._worker(self.transport_factory()))
+            for _ in range(self.workers)
+        ]
+
+    async def _drain(self) -> None:
+        while True:
+            await self._queue.join()
+            if not self._retries:
+                return
+            await asyncio.wait(set(self._retries))
+
+    async def stop(self, timeout: float = 10) -> None:
+        try:
+            await asyncio.wait_for(self._drain(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning("mail queue stopped with %s undelivered messages, %s of them waiting to retry",
+                           self._queue.qsize() + len(self._retries), len(self._retries))
+        for task in [*self._tasks, *self._retries]:
+            task.cancel()
+        await asyncio.gather(*self._tasks, *self._retries, return_exceptions=True)
+        self._tasks = []
+        self._retries.clear()
+
+    def full(self) -> bool:
+        return self._queue.full()
+
+    async def enqueue(self, message: Message, wait: bool = False) -> bool:
+        self.start()
+        if wait:
+            await self._queue.put(Envelope(message))
+            return True
+        try:
+            self._queue.put_nowait(Envelope(message))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            logger.warning("mail queue full, rejected mail to %s", message["To"])
+            return False
+        return True
+
+    def _next_batch(self, first: Envelope) -> list[Envelope]:
+        batch = [first]
+        while len(batch) < self.batch_size and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _worker(self, transport: MailTransport) -> None:
+        try:
+            while True:
+                batch = self._next_batch(await self._queue.get())
+                started = time.perf_counter()
+                try:
+                    failed = await asyncio.to_thread(transport.send_batch, [e.message for e in batch])
+                except Exception:
+                    logger.exception("mail transport crashed")
+                    failed = [e.message for e in batch]
+                stage_duration.observe(time.perf_counter() - started, "send_mail_batch")
+                failed_ids = {id(message) for message in failed}
+                for envelope in batch:
+                    if id(envelope.message) in failed_ids:
+                        self._retry(envelope)
+                    else:
+                        self.sent += 1
+                    self._queue.task_done()
+        finally:
+            await asyncio.to_thread(transport.close)
+
+    def _retry(self, envelope: Envelope) -> None:
+        envelope.attempts += 1
+        if envelope.attempts > self.max_retries:
+            self.dropped += 1
+            logger.error("giving up on mail to %s after %s attempts", envelope.message["To"], envelope.attempts)
+            return
+        self.retried += 1
+        task = asyncio.create_task(self._requeue_later(envelope))
+        self._retries.add(task)
+        task.add_done_callback(self._retries.discard)
+
+    async def _requeue_later(self, envelope: Envelope) -> None:
+        await asyncio.sleep(self.retry_backoff_seconds * 2 ** (envelope.attempts - 1))
+        await self._queue.put(envelope)
+
+    def stats(self) -> dict:
+        return {
+            "workers": len(self._tasks),
+            "queued": self._queue.qsize(),
+            "pending_retries": len(self._retries),
+            "sent": self.sent,
+            "retried": self.retried,
+            "dropped": self.dropped,
+            "rejected": self.rejected,
+        }
+
+
+mail_queue = MailQueue(
+    transport_factory=smtp_transport_factory,
+    workers=settings.smtp.mail_workers,
+    max_size=settings.smtp.mail_queue_size,
+    batch_size=settings.smtp.mail_batch_size,
+    max_retries=settings.smtp.mail_max_retries,
+    retry_backoff_seconds=settings.smtp.mail_retry_backoff_seconds,
+)
@@ -0,0 +1,182 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, UTC
+from typing import Awaitable, Callable
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from core.config import settings
+from db import database
+from db.crud import (
+    analyze_table_crud,
+    purge_expired_revoked_tokens_crud,
+    purge_refresh_sessions_crud,
+    purge_unverified_users_crud,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class MaintenanceJob:
+    name: str
+    purge: Callable[[AsyncSession, int], Awaitable[int]]
+    interval_seconds: float
+    table: str
+    leader_only: bool = True
+    next_run: float = 0.0
+    runs: int = 0
+    purged: int = 0
+    failures: int = 0
+
+
+class MaintenanceScheduler:
+    def __init__(self, jobs: list[MaintenanceJob], tick_seconds: float, lock_id: int, batch_size: int,
+                 batch_pause_seconds: float, analyze_threshold: int):
+        self.jobs = jobs
+        self.tick_seconds = tick_seconds
+        self.lock_id = lock_id
+        self.batch_size = batch_size
+        self.batch_pause_seconds = batch_pause_seconds
+        self.analyze_threshold = analyze_threshold
+        self._task: asyncio.Task | None = None
+        self._lock_connection: AsyncConnection | None = None
+        self.analyzed = 0
+
+    @property
+    def is_leader(self) -> bool:
+        return self._lock_connection is not None
+
+    async def _release_lock(self) -> None:
+        connection, self._lock_connection = self._lock_connection, None
+        if connection is None:
+            return
+        try:
+            await connection.execute(text("SELECT pg_advisory_unlock(:lock_id)"), {"lock_id": self.lock_id})
+        except Exception:
+            logger.warning("could not release maintenance lock, discarding its connection")
+            await connection.invalidate()
+        await connection.close()
+
+    async def _elect(self) -> bool:
+        if self._lock_connection is not None:
+            try:
+                await self._lock_connection.execute(text("SELECT 1"))
+                return True
+            except Exception:
+                logger.warning("lost maintenance leadership connection")
+                await self._release_lock()
+
+        connection = await database.engine.connect()
+        try:
+            await connection.execution_options(isolation_level="AUTOCOMMIT")
+            acquired = await connection.scalar(
+                text("SELECT pg_try_advisory_lock(:lock_id)"), {"lock_id": self.lock_id}
+            )
+        except Exception:
+            await connection.close()
+            raise
+        if not acquired:
+            await connection.close()
+            return False
+        logger.info("became maintenance leader")
+        self._lock_connection = connection
+        return True
+
+    async def run_job(self, job: MaintenanceJob) -> int:
+        purged = 0
+        while True:
+            async with database.async_session() as session:
+                deleted = await job.purge(session, self.batch_size)
+            purged += deleted
+            if deleted < self.batch_size:
+                break
+            await asyncio.sleep(self.batch_pause_seconds)
+
+        if purged >= self.analyze_threshold:
+            async with database.async_session() as session:
+                await analyze_table_crud(session=session, table=job.table)
+            self.analyzed += 1
+        if purged:
+            logger.info("maintenance job %s purged %s rows", job.name, purged)
+        return purged
+
+    async def tick(self) -> None:
+        leader = await self._elect()
+        now = time.monotonic()
+        for job in self.jobs:
+            if now < job.next_run or (job.leader_only and not leader):
+                continue
+            job.next_run = now + job.interval_seconds
+            try:
+                job.purged += await self.run_job(job)
+                job.runs += 1
+            except Exception:
+                job.failures += 1
+                logger.exception("maintenance job %s failed", job.name)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.tick()
+            except Exception:
+                logger.exception("maintenance tick failed")
+            await asyncio.sleep(self.tick_seconds)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self._release_lock()
+
+    def stats(self) -> dict:
+        stats = {"leader": int(self.is_leader), "analyzed": self.analyzed}
+        for job in self.jobs:
+            stats[f"{job.name}_runs"] = job.runs
+            stats[f"{job.name}_purged"] = job.purged
+            stats[f"{job.name}_failures"] = job.failures
+        return stats
+
+
+async def purge_unverified_users(session: AsyncSession, batch_size: int) -> int:
+    created_before = datetime.now(UTC).replace(tzinfo=None) - timedelta(
+        hours=settings.maintenance.unverified_user_max_age_hours
+    )
+    return await purge_unverified_users_crud(session=session, batch_size=batch_size, created_before=created_before)
+
+
+maintenance_scheduler = MaintenanceScheduler(
+    jobs=[
+        MaintenanceJob(
+            name="unverified_users",
+            purge=purge_unverified_users,
+            interval_seconds=settings.maintenance.unverified_users_interval_seconds,
+            table="users",
+        ),
+        MaintenanceJob(
+            name="revoked_tokens",
+            purge=purge_expired_revoked_tokens_crud,
+            interval_seconds=settings.revocation.purge_interval_seconds,
+            table="revoked_tokens",
+        ),
+        MaintenanceJob(
+            name="refresh_sessions",
+            purge=purge_refresh_sessions_crud,
+            interval_seconds=settings.maintenance.refresh_sessions_interval_seconds,
+            table="refresh_sessions",
+        ),
+    ],
+    tick_seconds=settings.maintenance.tick_seconds,
+    lock_id=settings.maintenance.lock_id,
+    batch_size=settings.maintenance.batch_size,
+    batch_pause_seconds=settings.maintenance.batch_pause_seconds,
+    analyze_threshold=settings.maintenance.analyze_threshold,
+)
@@ -0,0 +1,49 @@
+import ipaddress
+
+from fastapi import HTTPException, Request
+from starlette import status
+
+from core.config import settings
+
+
+def parse_networks(values: list[str]) -> list[ipaddress.IPv4Network | ipaddress.IPv6Network]:
+    return [ipaddress.ip_network(value, strict=False) for value in values]
+
+
+def in_networks(address: str, networks: list) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in networks)
+
+
+class ClientAddress:
+    def __init__(self, trusted_proxies: list[str]):
+        self.trusted_proxies = parse_networks(trusted_proxies)
+
+    def __call__(self, request: Request) -> str:
+        address = request.client.host if request.client else "unknown"
+        if not in_networks(address, self.trusted_proxies):
+            return address
+        forwarded = [hop.strip() for hop in request.headers.get("x-forwarded-for", "").split(",") if hop.strip()]
+        for hop in reversed(forwarded):
+            if not in_networks(hop, self.trusted_proxies):
+                return hop
+        return forwarded[0] if forwarded else address
+
+
+class NetworkAllowlist:
+    def __init__(self, networks: list[str]):
+        self.networks = parse_networks(networks)
+
+    def __call__(self, request: Request) -> None:
+        if not in_networks(client_address(request), self.networks):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="internal endpoint",
+            )
+
+
+client_address = ClientAddress(settings.network.trusted_proxies)
+require_internal_network = NetworkAllowlist(settings.network.internal_networks)
@@ -0,0 +1,124 @@
+import time
+from dataclasses import dataclass, replace
+
+import bcrypt
+
+from core.config import settings
+
+try:
+    import argon2
+except ImportError:
+    argon2 = None
+
+ARGON2_PREFIX = b"$argon2"
+CALIBRATION_PASSWORD = "calibration-password"
+
+
+@dataclass(frozen=True, slots=True)
+class HashPolicy:
+    scheme: str = "bcrypt"
+    bcrypt_rounds: int = 12
+    argon2_time_cost: int = 3
+    argon2_memory_kib: int = 65536
+    argon2_parallelism: int = 1
+
+    def __post_init__(self):
+        if self.scheme not in ("bcrypt", "argon2"):
+            raise ValueError(f"unsupported password hash scheme {self.scheme!r}")
+        if self.scheme == "argon2" and argon2 is None:
+            raise RuntimeError("argon2 password hashing requires the argon2-cffi package")
+
+    @property
+    def cost(self) -> int:
+        return self.argon2_time_cost if self.scheme == "argon2" else self.bcrypt_rounds
+
+    def argon2_hasher(self):
+        return argon2.PasswordHasher(
+            time_cost=self.argon2_time_cost,
+            memory_cost=self.argon2_memory_kib,
+            parallelism=self.argon2_parallelism,
+        )
+
+
+default_policy = HashPolicy(
+    scheme=settings.hashing.scheme,
+    bcrypt_rounds=settings.hashing.bcrypt_rounds,
+    argon2_time_cost=settings.hashing.argon2_time_cost,
+    argon2_memory_kib=settings.hashing.argon2_memory_kib,
+    argon2_parallelism=settings.hashing.argon2_parallelism,
+)
+
+
+def hash_password(
+        password: str,
+        policy: HashPolicy = default_policy,
+) -> bytes:
+    if policy.scheme == "argon2":
+        return policy.argon2_hasher().hash(password).encode()
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(policy.bcrypt_rounds))
+
+
+def hash_passwords(
+        passwords: list[str],
+        policy: HashPolicy = default_policy,
+) -> list[bytes]:
+    return [hash_password(password, policy) for password in passwords]
+
+
+def validate_password(
+        password: str,
+        hashed_password: bytes,
+) -> bool:
+    if hashed_password.startswith(ARGON2_PREFIX):
+        if argon2 is None:
+            raise RuntimeError("verifying argon2 hashes requires the argon2-cffi package")
+        try:
+            return argon2.PasswordHasher().verify(hashed_password.decode(), password)
+        except (argon2.exceptions.VerificationError, argon2.exceptions.InvalidHashError):
+            return False
+    return bcrypt.checkpw(
+        password=password.encode(),
+        hashed_password=hashed_password,
+    )
+
+
+def needs_rehash(hashed_password: bytes, policy: HashPolicy = default_policy) -> bool:
+    if hashed_password.startswith(ARGON2_PREFIX):
+        if policy.scheme != "argon2":
+            return True
+        parameters = argon2.extract_parameters(hashed_password.decode())
+        return (parameters.time_cost < policy.argon2_time_cost
+                or parameters.memory_cost < policy.argon2_memory_kib)
+    if policy.scheme != "bcrypt":
+        return True
+    return int(hashed_password[4:6]) < policy.bcrypt_rounds
+
+
+def hash_seconds(policy: HashPolicy, samples: int = 3) -> float:
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        hash_password(CALIBRATION_PASSWORD, policy)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def calibrate(
+        policy: HashPolicy,
+        target_ms: float,
+        min_bcrypt_rounds: int,
+        max_bcrypt_rounds: int,
+        max_argon2_time_cost: int,
+) -> HashPolicy:
+    target = target_ms / 1000
+    if policy.scheme == "argon2":
+        per_pass = hash_seconds(replace(policy, argon2_time_cost=1))
+        time_cost = min(max_argon2_time_cost, max(1, int(target / per_pass)))
+        return replace(policy, argon2_time_cost=time_cost)
+
+    rounds = min_bcrypt_rounds
+    elapsed = hash_seconds(replace(policy, bcrypt_rounds=rounds))
+    while rounds < max_bcrypt_rounds and elapsed * 2 <= target:
+        rounds += 1
+        elapsed *= 2
+    return replace(policy, bcrypt_rounds=rounds)
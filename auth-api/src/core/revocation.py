@@ -0,0 +1,145 @@
+import asyncio
+import hashlib
+import logging
+import math
+import time
+from datetime import datetime, timedelta, UTC
+
+from core.config import settings
+from db.crud import get_revoked_tokens_crud, revoke_token_crud
+from db.database import async_session
+
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    __slots__ = ("size", "hash_count", "bits", "count")
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hash_count):
+            yield (first + i * second) % self.size
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+def utc_naive(timestamp: float) -> datetime:
+    return datetime.fromtimestamp(timestamp, UTC).replace(tzinfo=None)
+
+
+class RevocationIndex:
+    def __init__(self, capacity: int, error_rate: float, refresh_interval_seconds: float,
+                 purge_interval_seconds: float):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.refresh_interval_seconds = refresh_interval_seconds
+        self.purge_interval_seconds = purge_interval_seconds
+        self._bloom = BloomFilter(capacity, error_rate)
+        self._revoked: dict[str, float] = {}
+        self._last_revoked_at: datetime | None = None
+        self._task: asyncio.Task | None = None
+        self.checks = 0
+        self.bloom_positives = 0
+
+    def __len__(self) -> int:
+        return len(self._revoked)
+
+    def add(self, jti: str, expires_at: float) -> None:
+        if jti in self._revoked:
+            return
+        self._revoked[jti] = expires_at
+        self._bloom.add(jti)
+        if self._bloom.count > self.capacity:
+            self._rebuild()
+
+    def is_revoked(self, jti: str | None) -> bool:
+        self.checks += 1
+        if jti is None or jti not in self._bloom:
+            return False
+        self.bloom_positives += 1
+        return jti in self._revoked
+
+    def _rebuild(self) -> None:
+        now = time.time()
+        self._revoked = {jti: exp for jti, exp in self._revoked.items() if exp > now}
+        self.capacity = max(self.capacity, len(self._revoked) * 2)
+        self._bloom = BloomFilter(self.capacity, self.error_rate)
+        for jti in self._revoked:
+            self._bloom.add(jti)
+
+    def _apply(self, rows) -> None:
+        for jti, expires_at, revoked_at in rows:
+            self.add(jti, expires_at.replace(tzinfo=UTC).timestamp())
+            if self._last_revoked_at is None or revoked_at > self._last_revoked_at:
+                self._last_revoked_at = revoked_at
+
+    async def revoke(self, jti: str, expires_at: float) -> None:
+        async with async_session() as session:
+            await revoke_token_crud(jti=jti, expires_at=utc_naive(expires_at), session=session)
+        self.add(jti, expires_at)
+
+    async def load(self) -> None:
+        async with async_session() as session:
+            rows = await get_revoked_tokens_crud(session=session)
+        self._apply(rows)
+
+    async def refresh(self) -> None:
+        revoked_since = None
+        if self._last_revoked_at is not None:
+            revoked_since = self._last_revoked_at - timedelta(seconds=self.refresh_interval_seconds * 2)
+        async with async_session() as session:
+            rows = await get_revoked_tokens_crud(session=session, revoked_since=revoked_since)
+        self._apply(rows)
+
+    async def _run(self) -> None:
+        next_purge = time.monotonic() + self.purge_interval_seconds
+        while True:
+            await asyncio.sleep(self.refresh_interval_seconds)
+            try:
+                await self.refresh()
+                if time.monotonic() >= next_purge:
+                    next_purge = time.monotonic() + self.purge_interval_seconds
+                    self._rebuild()
+            except Exception:
+                logger.exception("revocation index refresh failed")
+
+    async def start(self) -> None:
+        await self.load()
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "revoked": len(self._revoked),
+            "bloom_bits": self._bloom.size,
+            "checks": self.checks,
+            "bloom_positives": self.bloom_positives,
+        }
+
+
+revocation_index = RevocationIndex(
+    capacity=settings.revocation.bloom_capacity,
+    error_rate=settings.revocation.bloom_error_rate,
+    refresh_interval_seconds=settings.revocation.refresh_interval_seconds,
+    purge_interval_seconds=settings.revocation.purge_interval_seconds,
+)
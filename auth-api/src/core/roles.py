@@ -0,0 +1,35 @@
+import time
+
+from core.config import settings
+from db.crud import get_roles_crud
+from db.database import async_read_session
+
+
+class RoleTable:
+    def __init__(self, reload_interval_seconds: float):
+        self.reload_interval_seconds = reload_interval_seconds
+        self._bits: dict[str, int] = {}
+        self._loaded_at = 0.0
+        self.version = 0
+
+    async def load(self) -> None:
+        async with async_read_session() as session:
+            rows = await get_roles_crud(session=session)
+        self._bits = {title: 1 << role_id for role_id, title in rows}
+        self._loaded_at = time.monotonic()
+        self.version += 1
+
+    async def mask_for(self, titles: tuple[str, ...]) -> int:
+        if any(title not in self._bits for title in titles) and (
+                time.monotonic() - self._loaded_at > self.reload_interval_seconds):
+            await self.load()
+        mask = 0
+        for title in titles:
+            mask |= self._bits.get(title, 0)
+        return mask
+
+    def titles(self, mask: int) -> list[str]:
+        return [title for title, bit in self._bits.items() if mask & bit]
+
+
+role_table = RoleTable(reload_interval_seconds=settings.cache.role_table_reload_interval_seconds)
@@ -5,3 +5,20 @@ class TokenInfo(BaseModel):
     access_token: str
     refresh_token: str | None = None
     token_type: str = "Bearer"
+
+
+class IntrospectionRequest(BaseModel):
+    tokens: list[str]
+
+
+class TokenIntrospection(BaseModel):
+    active: bool
+    token_type: str | None = None
+    sub: str | None = None
+    user_id: int | None = None
+    claims: dict | None = None
+    error: str | None = None
+
+
+class IntrospectionResponse(BaseModel):
+    results: list[TokenIntrospection]
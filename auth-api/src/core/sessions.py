@@ -0,0 +1,77 @@
+import logging
+import uuid
+from datetime import datetime, timedelta, UTC
+
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette import status
+
+from core.cache import user_cache
+from core.config import settings
+from core.helpers import create_refresh_token
+from db.crud import (
+    create_refresh_session_crud,
+    revoke_refresh_session_crud,
+    revoke_user_sessions_crud,
+    rotate_refresh_session_crud,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class RefreshSessions:
+    def __init__(self):
+        self.started = 0
+        self.rotated = 0
+        self.reuse_detected = 0
+
+    async def start_session(self, user, session: AsyncSession) -> str:
+        family_id = uuid.uuid4()
+        jti = str(uuid.uuid4())
+        expires_at = datetime.now(UTC).replace(tzinfo=None) + timedelta(
+            days=int(settings.auth_jwt.refresh_token_expire_days)
+        )
+        await create_refresh_session_crud(session=session, family_id=family_id, user_id=user.id, jti=jti,
+                                          expires_at=expires_at)
+        self.started += 1
+        return create_refresh_token(user, family_id=family_id, jti=jti, expires_at=expires_at)
+
+    async def rotate(self, user, payload: dict, session: AsyncSession) -> str:
+        try:
+            family_id = uuid.UUID(payload["fam"])
+        except (KeyError, ValueError):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="refresh token has no session, log in again",
+            )
+
+        jti = str(uuid.uuid4())
+        row = await rotate_refresh_session_crud(session=session, family_id=family_id, old_jti=payload["jti"],
+                                                new_jti=jti)
+        if row is None:
+            if await revoke_refresh_session_crud(session=session, family_id=family_id):
+                self.reuse_detected += 1
+                logger.warning("refresh token reuse detected for session %s of %s", family_id, user.email)
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="refresh session expired or revoked",
+            )
+        self.rotated += 1
+        return create_refresh_token(user, family_id=family_id, jti=jti, expires_at=row.expires_at)
+
+    async def revoke(self, family_id: uuid.UUID, session: AsyncSession, user_id: int | None = None) -> bool:
+        return await revoke_refresh_session_crud(session=session, family_id=family_id, user_id=user_id) > 0
+
+    async def revoke_all(self, user, session: AsyncSession) -> None:
+        await revoke_user_sessions_crud(session=session, user_id=user.id)
+        user_cache.invalidate(email=user.email, user_id=user.id)
+
+    def stats(self) -> dict:
+        return {
+            "started": self.started,
+            "rotated": self.rotated,
+            "reuse_detected": self.reuse_detected,
+        }
+
+
+refresh_sessions = RefreshSessions()
@@ -0,0 +1,156 @@
+import logging
+import math
+import time
+
+from fastapi import HTTPException
+from starlette import status
+
+from core.config import settings
+
+try:
+    import redis.asyncio as redis
+except ImportError:
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryCounterStore:
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self._entries: dict[str, tuple[int, int, int]] = {}
+        self._window = 0
+
+    def _sweep(self, window: int) -> None:
+        self._window = window
+        self._entries = {key: entry for key, entry in self._entries.items() if entry[0] >= window - 1}
+
+    async def incr(self, key: str, window: int, ttl: int) -> tuple[int, int]:
+        if window != self._window:
+            self._sweep(window)
+        entry = self._entries.pop(key, None)
+        if entry is None or entry[0] < window - 1:
+            previous, current = 0, 0
+        elif entry[0] == window - 1:
+            previous, current = entry[2], 0
+        else:
+            previous, current = entry[1], entry[2]
+        current += 1
+        self._entries[key] = (window, previous, current)
+        while len(self._entries) > self.max_keys:
+            del self._entries[next(iter(self._entries))]
+        return previous, current
+
+    async def reset(self, key: str, window: int) -> None:
+        self._entries.pop(key, None)
+
+    def size(self) -> int:
+        return len(self._entries)
+
+    async def close(self) -> None:
+        self._entries.clear()
+
+
+class RedisCounterStore:
+    def __init__(self, url: str, prefix: str = "login-throttle"):
+        if redis is None:
+            raise RuntimeError("the redis login throttle backend requires the redis package")
+        self.prefix = prefix
+        self._client = redis.from_url(url)
+
+    async def incr(self, key: str, window: int, ttl: int) -> tuple[int, int]:
+        current_key = f"{self.prefix}:{key}:{window}"
+        async with self._client.pipeline(transaction=False) as pipe:
+            pipe.incr(current_key)
+            pipe.expire(current_key, ttl)
+            pipe.get(f"{self.prefix}:{key}:{window - 1}")
+            current, _, previous = await pipe.execute()
+        return int(previous or 0), current
+
+    async def reset(self, key: str, window: int) -> None:
+        await self._client.delete(f"{self.prefix}:{key}:{window}", f"{self.prefix}:{key}:{window - 1}")
+
+    def size(self) -> None:
+        return None
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+class LoginThrottle:
+    def __init__(self, store, window_seconds: int, max_per_email: int, max_per_ip: int):
+        self.store = store
+        self.window_seconds = window_seconds
+        self.max_per_email = max_per_email
+        self.max_per_ip = max_per_ip
+        self.checks = 0
+        self.throttled_email = 0
+        self.throttled_ip = 0
+        self.backend_errors = 0
+
+    async def _estimate(self, key: str, now: float) -> float:
+        window, elapsed = divmod(now, self.window_seconds)
+        previous, current = await self.store.incr(key, int(window), self.window_seconds * 2)
+        return previous * (1 - elapsed / self.window_seconds) + current
+
+    def _reject(self, now: float) -> HTTPException:
+        retry_after = math.ceil(self.window_seconds - now % self.window_seconds)
+        return HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="too many login attempts",
+            headers={"Retry-After": str(retry_after)},
+        )
+
+    async def reset(self, email: str) -> None:
+        try:
+            await self.store.reset(f"email:{email}", int(time.time() // self.window_seconds))
+        except Exception:
+            self.backend_errors += 1
+            logger.exception("login throttle backend failed to reset %s", email)
+
+    async def check(self, email: str, client_ip: str) -> None:
+        self.checks += 1
+        now = time.time()
+        try:
+            ip_attempts = await self._estimate(f"ip:{client_ip}", now)
+            if ip_attempts > self.max_per_ip:
+                email_attempts = 0
+            else:
+                email_attempts = await self._estimate(f"email:{email}", now)
+        except Exception:
+            self.backend_errors += 1
+            logger.exception("login throttle backend failed, allowing attempt")
+            return
+        if ip_attempts > self.max_per_ip:
+            self.throttled_ip += 1
+            raise self._reject(now)
+        if email_attempts > self.max_per_email:
+            self.throttled_email += 1
+            raise self._reject(now)
+
+    async def close(self) -> None:
+        await self.store.close()
+
+    def stats(self) -> dict:
+        return {
+            "backend": type(self.store).__name__,
+            "tracked_keys": self.store.size(),
+            "checks": self.checks,
+            "throttled_email": self.throttled_email,
+            "throttled_ip": self.throttled_ip,
+            "backend_errors": self.backend_errors,
+        }
+
+
+def counter_store_factory():
+    if settings.throttle.backend == "redis":
+        return RedisCounterStore(settings.throttle.redis_url)
+    return MemoryCounterStore(settings.throttle.max_keys)
+
+
+login_throttle = LoginThrottle(
+    store=counter_store_factory(),
+    window_seconds=settings.throttle.window_seconds,
+    max_per_email=settings.throttle.max_per_email,
+    max_per_ip=settings.throttle.max_per_ip,
+)
@@ -1,9 +1,7 @@
-import smtplib
 import uuid
 from datetime import datetime, timedelta, UTC, timezone
 from email.mime.text import MIMEText
 
-import bcrypt
 import jwt
 from fastapi import HTTPException
 from jwt import InvalidTokenError
@@ -12,13 +10,17 @@ from starlette import status
 
 from api.v1.schemas import PasswordResetRequest
 from core.config import settings
-from db.crud import get_user_model_by_email, reset_password_crud
+from core.keys import key_manager
+from core.mail import mail_queue
+from core.metrics import timed
+from db import crud as user_crud
 
 
+@timed("encode_jwt")
 def encode_jwt(
         payload: dict,
-        private_key: str = settings.auth_jwt.private_key_path.read_text(),
-        algorithm: str = settings.auth_jwt.algorithm,
+        private_key: str | None = None,
+        algorithm: str | None = None,
         expire_minutes: int = settings.auth_jwt.access_token_expire_minutes,
         expire_timedelta: timedelta | None = None,
 ) -> str:
@@ -31,47 +33,39 @@ def encode_jwt(
     to_encode.update(
         exp=expire,
         iat=now,
-        jti=str(uuid.uuid4()),
     )
+    to_encode.setdefault("jti", str(uuid.uuid4()))
+    if private_key is not None:
+        return jwt.encode(to_encode, private_key, algorithm=algorithm or settings.auth_jwt.algorithm)
+
+    signing_key = key_manager.signing_key()
     encoded = jwt.encode(
         to_encode,
-        private_key,
-        algorithm=algorithm,
+        signing_key.private_key,
+        algorithm=signing_key.algorithm,
+        headers={"kid": signing_key.kid},
     )
     return encoded
 
 
+@timed("decode_jwt")
 def decode_jwt(
         token: str | bytes,
-        public_key: str = settings.auth_jwt.public_key_path.read_text(),
-        algorithm: str = settings.auth_jwt.algorithm,
+        public_key: str | None = None,
+        algorithm: str | None = None,
 ) -> dict:
+    if public_key is not None:
+        return jwt.decode(token, public_key, algorithms=[algorithm or settings.auth_jwt.algorithm])
+
+    verification_key = key_manager.verification_key(jwt.get_unverified_header(token).get("kid"))
     decoded = jwt.decode(
         token,
-        public_key,
-        algorithms=[algorithm],
+        verification_key.public_key,
+        algorithms=[verification_key.algorithm],
     )
     return decoded
 
 
-def hash_password(
-        password: str,
-) -> bytes:
-    salt = bcrypt.gensalt()
-    pwd_bytes: bytes = password.encode()
-    return bcrypt.hashpw(pwd_bytes, salt)
-
-
-def validate_password(
-        password: str,
-        hashed_password: bytes,
-) -> bool:
-    return bcrypt.checkpw(
-        password=password.encode(),
-        hashed_password=hashed_password,
-    )
-
-
 async def send_password_reset_email(user):
     reset_token = create_password_reset_token(user)
     reset_url = f"http://localhost:8000/api/v1/password-reset?token={reset_token}"
@@ -81,9 +75,11 @@ async def send_password_reset_email(user):
     msg['From'] = settings.smtp.smtp_user
     msg['To'] = user.email
 
-    with smtplib.SMTP_SSL("smtp.gmail.com", 465) as smtp:
-        smtp.login(settings.smtp.smtp_user, settings.smtp.smtp_pass)
-        smtp.send_message(msg)
+    if not await mail_queue.enqueue(msg):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Mail service is busy, try again later"
+        )
 
 
 def create_password_reset_token(user):
@@ -104,7 +100,7 @@ async def reset_password_util(session: AsyncSession, password_reset_request: Pas
             )
 
         email = payload["sub"]
-        await reset_password_crud(email=email, session=session, password_reset_request=password_reset_request)
+        await user_crud.reset_password_crud(email=email, session=session, password_reset_request=password_reset_request)
         return {"detail": "Password reset successful"}
 
     except (InvalidTokenError, KeyError):
@@ -114,7 +110,7 @@ async def reset_password_util(session: AsyncSession, password_reset_request: Pas
         )
 
 
-async def send_verification_email(user):
+async def send_verification_email(user, wait: bool = False) -> bool:
     verification_token = create_verification_token(user)
     verification_url = f"http://localhost:8000/api/v1/verify-email?token={verification_token}"
 
@@ -123,9 +119,7 @@ async def send_verification_email(user):
     msg['From'] = settings.smtp.smtp_user
     msg['To'] = user.email
 
-    with smtplib.SMTP_SSL("smtp.gmail.com", 465) as smtp:
-        smtp.login(settings.smtp.smtp_user, settings.smtp.smtp_pass)
-        smtp.send_message(msg)
+    return await mail_queue.enqueue(msg, wait=wait)
 
 
 def create_verification_token(user):
@@ -1,18 +1,27 @@
-from fastapi import Depends, HTTPException, Form
+import time
+
+from fastapi import BackgroundTasks, Depends, HTTPException, Form, Request
 from fastapi.security import OAuth2PasswordBearer
 from jwt import InvalidTokenError
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
 
-from api.v1.schemas import UserOut, UserSchema
-from db.database import get_session
+from api.v1.schemas import UserOut, UserSchema, normalize_email
+from core.config import settings
+from db.database import async_session, get_session, get_read_session
 from .helpers import (
     TOKEN_TYPE_FIELD,
     ACCESS_TOKEN_TYPE,
     REFRESH_TOKEN_TYPE,
 )
 from . import utils as auth_utils
-from db.crud import get_user_by_email
+from .cache import UserRecord, user_cache
+from .hashing import password_hasher
+from .network import client_address
+from .revocation import revocation_index
+from .roles import role_table
+from .throttling import login_throttle
+from db.crud import get_user_record_by_email, get_login_row_by_email, update_password_hash_crud
 
 oauth2_scheme = OAuth2PasswordBearer(
     tokenUrl="/api/v1/login/",
@@ -31,6 +40,11 @@ def get_current_token_payload(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=f"invalid token error: {e}",
         )
+    if revocation_index.is_revoked(payload.get("jti")):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="token revoked",
+        )
     return payload
 
 
@@ -47,16 +61,30 @@ def validate_token_type(
     )
 
 
-async def get_user_by_token_sub(payload: dict, session: AsyncSession) -> UserOut:
+async def get_user_by_token_sub(payload: dict, session: AsyncSession) -> UserRecord:
     email: str | None = payload.get("sub")
-    if user := await get_user_by_email(email=email, session=session):
+    if user := user_cache.get_by_email(email):
         return user
+    if user := await get_user_record_by_email(email=email, session=session):
+        return user_cache.put(user)
     raise HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="token invalid (user not found)",
     )
 
 
+async def get_user_by_token_claims(payload: dict, session: AsyncSession) -> UserRecord:
+    if time.time() - payload["iat"] <= settings.auth_jwt.stateless_trust_seconds:
+        return UserRecord.from_claims(payload)
+    user = await get_user_by_token_sub(payload=payload, session=session)
+    if user.token_version != payload["ver"]:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="token invalid (token version outdated)",
+        )
+    return user
+
+
 class UserGetterFromToken:
     def __init__(self, token_type: str):
         self.token_type = token_type
@@ -64,9 +92,11 @@ class UserGetterFromToken:
     async def __call__(
             self,
             payload: dict = Depends(get_current_token_payload),
-            session: AsyncSession = Depends(get_session),
+            session: AsyncSession = Depends(get_read_session),
     ):
         validate_token_type(payload, self.token_type)
+        if self.token_type == ACCESS_TOKEN_TYPE and "ver" in payload:
+            return await get_user_by_token_claims(payload=payload, session=session)
         return await get_user_by_token_sub(payload=payload, session=session)
 
 
@@ -96,24 +126,71 @@ def get_current_active_auth_user(
     )
 
 
+class RoleChecker:
+    def __init__(self, titles: tuple[str, ...], require_all: bool = False):
+        self.titles = titles
+        self.require_all = require_all
+        self._required = 0
+        self._table_version = -1
+
+    async def __call__(
+            self,
+            user: UserSchema = Depends(get_current_active_auth_user),
+    ):
+        if not self._required or self._table_version != role_table.version:
+            self._required = await role_table.mask_for(self.titles)
+            self._table_version = role_table.version
+        granted = user.role_mask & self._required
+        if self._required and (granted == self._required if self.require_all else granted):
+            return user
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="insufficient role",
+        )
+
+
+def require_roles(*titles: str, require_all: bool = False) -> RoleChecker:
+    return RoleChecker(titles=titles, require_all=require_all)
+
+
+async def rehash_password(user_id: int, password: str, hashed_password: bytes) -> None:
+    try:
+        new_hash = await password_hasher.hash(password)
+    except HTTPException:
+        return
+    async with async_session() as session:
+        if await update_password_hash_crud(session=session, user_id=user_id, old_hash=hashed_password,
+                                           new_hash=new_hash):
+            password_hasher.rehashed += 1
+
+
 async def validate_auth_user(
+        request: Request,
+        background_tasks: BackgroundTasks,
         username: str = Form(),
         password: str = Form(),
         session: AsyncSession = Depends(get_session),
 ):
+    username = normalize_email(username)
+    await login_throttle.check(email=username, client_ip=client_address(request))
+
     unauthed_exc = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="invalid email or password",
     )
-    if not (user := await get_user_by_email(email=username, session=session)):
+    user = await get_login_row_by_email(email=username, session=session)
+    await session.rollback()
+    if not user:
         raise unauthed_exc
 
-    if not auth_utils.validate_password(
+    if not await password_hasher.verify(
             password=password,
             hashed_password=user.hashed_password,
     ):
         raise unauthed_exc
 
+    await login_throttle.reset(email=username)
+
     if not user.active:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -126,4 +203,7 @@ async def validate_auth_user(
             detail="email not verified",
         )
 
-    return user
+    if settings.hashing.rehash_on_login and password_hasher.needs_rehash(user.hashed_password):
+        background_tasks.add_task(rehash_password, user.id, password, user.hashed_password)
+
+    return UserRecord.from_row(user)
@@ -1,80 +1,332 @@
-import sqlalchemy
+import datetime
+import uuid
+
 from fastapi import HTTPException
-from sqlalchemy import select
+from sqlalchemy import select, delete, func, text, tuple_, update
+from sqlalchemy.dialects.postgresql import insert
 from fastapi import status
 
 from api.v1 import schemas as user_schemas
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from api.v1.schemas import UserSchema, PasswordResetRequest
-import core.utils as utils
+from api.v1.schemas import UserSchema, PasswordResetRequest, normalize_email
+from core.cache import UserRecord, recent_emails, user_cache
+from core import hashing
 from db import models as user_models
-from core import utils as auth_utils
+from db import queries
+from core.metrics import timed
 
 
+@timed("db.create_user_crud")
 async def create_user_crud(user_in: user_schemas.CreateUser, session: AsyncSession) -> user_schemas.UserOut:
-    try:
-
-        hashed_password = auth_utils.hash_password(user_in.hashed_password)
-        new_user = user_models.User(email=user_in.email,
-                                    full_name=user_in.full_name,
-                                    hashed_password=hashed_password)
-
-        session.add(new_user)
-        await session.commit()
+    duplicate_exc = HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                                  detail="User with this email already exists.")
+    if user_in.email in recent_emails:
+        raise duplicate_exc
+    exists = await session.scalar(queries.email_exists, {"email": user_in.email})
+    await session.rollback()
+    if exists:
+        recent_emails.add(user_in.email)
+        raise duplicate_exc
 
-        user_model = user_schemas.UserOut.model_validate(new_user)
-        return user_model
-
-    except sqlalchemy.exc.IntegrityError:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="User with this email already exists.")
+    hashed_password = await hashing.password_hasher.hash(user_in.hashed_password)
+    query = (
+        insert(user_models.User)
+        .values(email=user_in.email, full_name=user_in.full_name, hashed_password=hashed_password)
+        .on_conflict_do_nothing(index_elements=[func.lower(user_models.User.email)])
+        .returning(user_models.User.id, user_models.User.email, user_models.User.full_name,
+                   user_models.User.created_at)
+    )
+    response = await session.execute(query)
+    new_user = response.first()
+    await session.commit()
+    recent_emails.add(user_in.email)
+    if new_user is None:
+        raise duplicate_exc
 
+    return user_schemas.UserOut.model_validate(new_user)
 
-async def get_user_by_id(user_id: int, session: AsyncSession) -> user_schemas.UserOut:
-    query = select(user_models.User).where(user_models.User.id == user_id)
-    response = await session.execute(query)
-    user = response.scalars().first()
 
-    return user
+@timed("db.get_user_record_by_email")
+async def get_user_record_by_email(email: str, session: AsyncSession) -> UserRecord | None:
+    response = await session.execute(queries.user_record_by_email, {"email": normalize_email(email)})
+    row = response.first()
+    return UserRecord.from_row(row) if row else None
 
 
-async def get_user_by_email(email: str, session: AsyncSession) -> user_schemas.UserOut:
-    query = select(user_models.User).where(user_models.User.email == email)
-    response = await session.execute(query)
-    user = response.scalars().first()
+@timed("db.get_user_records_by_emails")
+async def get_user_records_by_emails(emails: list[str], session: AsyncSession) -> list[UserRecord]:
+    emails = [normalize_email(email) for email in emails]
+    response = await session.execute(queries.user_records_by_emails, {"emails": emails})
+    return [UserRecord.from_row(row) for row in response]
 
-    return user
 
+@timed("db.get_login_row_by_email")
+async def get_login_row_by_email(email: str, session: AsyncSession):
+    response = await session.execute(queries.login_row_by_email, {"email": normalize_email(email)})
+    return response.first()
 
-async def get_user_model_by_email(email: str, session: AsyncSession):
-    query = select(user_models.User).where(user_models.User.email == email)
-    response = await session.execute(query)
-    user = response.scalars().first()
 
-    return user
+@timed("db.get_roles_crud")
+async def get_roles_crud(session: AsyncSession):
+    response = await session.execute(queries.roles)
+    return response.all()
 
 
+@timed("db.delete_user_crud")
 async def delete_user_crud(current_user: UserSchema, session: AsyncSession):
-    user_to_delete = await get_user_by_id(current_user.id, session)
-    await session.delete(user_to_delete)
+    roles_deleted = delete(user_models.UserRole).where(user_models.UserRole.user_id == current_user.id).cte("roles_deleted")
+    query = (
+        delete(user_models.User)
+        .where(user_models.User.id == current_user.id)
+        .returning(user_models.User.id)
+        .add_cte(roles_deleted)
+    )
+    response = await session.execute(query)
+    deleted = response.first()
     await session.commit()
-    return
+    user_cache.invalidate(email=current_user.email, user_id=current_user.id)
+    recent_emails.discard(current_user.email)
+    if deleted is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
 
 
+@timed("db.reset_password_crud")
 async def reset_password_crud(session: AsyncSession, email: str, password_reset_request: PasswordResetRequest):
-    user = await get_user_model_by_email(session=session, email=email)
-    if not user:
+    response = await session.execute(queries.password_by_email, {"email": normalize_email(email)})
+    current = response.first()
+    await session.rollback()
+    if current is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
 
-    if utils.validate_password(password_reset_request.new_password, user.hashed_password):
+    if await hashing.password_hasher.verify(password_reset_request.new_password, current.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="New password must be different from the current password"
         )
 
-    user.hashed_password = utils.hash_password(password_reset_request.new_password)
-    session.add(user)
+    hashed_password = await hashing.password_hasher.hash(password_reset_request.new_password)
+    query = (
+        update(user_models.User)
+        .where(user_models.User.id == current.id, user_models.User.hashed_password == current.hashed_password)
+        .values(hashed_password=hashed_password, token_version=user_models.User.token_version + 1)
+        .returning(user_models.User.id)
+    )
+    response = await session.execute(query)
+    updated = response.first()
     await session.commit()
+    if updated is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Password was changed concurrently, try again"
+        )
+    user_cache.invalidate(user_id=current.id)
+
+
+@timed("db.verify_email_crud")
+async def verify_email_crud(session: AsyncSession, email: str):
+    target = (
+        select(user_models.User.id, user_models.User.is_verified)
+        .where(func.lower(user_models.User.email) == normalize_email(email))
+        .cte("target")
+    )
+    verified = (
+        update(user_models.User)
+        .where(user_models.User.id == target.c.id, target.c.is_verified.is_(False))
+        .values(is_verified=True)
+        .returning(user_models.User.id)
+        .cte("verified")
+    )
+    response = await session.execute(select(target.c.id, target.c.is_verified).add_cte(verified))
+    user = response.first()
+    await session.commit()
+    if user is not None and not user.is_verified:
+        user_cache.invalidate(user_id=user.id)
+    return user
+
+
+@timed("db.update_password_hash_crud")
+async def update_password_hash_crud(session: AsyncSession, user_id: int, old_hash: bytes, new_hash: bytes) -> bool:
+    query = (
+        update(user_models.User)
+        .where(user_models.User.id == user_id, user_models.User.hashed_password == old_hash)
+        .values(hashed_password=new_hash)
+    )
+    result = await session.execute(query)
+    await session.commit()
+    return result.rowcount == 1
+
+
+@timed("db.revoke_token_crud")
+async def revoke_token_crud(jti: str, expires_at: datetime.datetime, session: AsyncSession):
+    query = insert(user_models.RevokedToken).values(jti=jti, expires_at=expires_at).on_conflict_do_nothing()
+    await session.execute(query)
+    await session.commit()
+
+
+@timed("db.get_revoked_tokens_crud")
+async def get_revoked_tokens_crud(session: AsyncSession, revoked_since: datetime.datetime | None = None):
+    query = select(user_models.RevokedToken.jti, user_models.RevokedToken.expires_at,
+                   user_models.RevokedToken.revoked_at).where(
+        user_models.RevokedToken.expires_at > func.timezone("utc", func.now())
+    )
+    if revoked_since is not None:
+        query = query.where(user_models.RevokedToken.revoked_at >= revoked_since)
+    response = await session.execute(query)
+    return response.all()
+
+
+@timed("db.purge_expired_revoked_tokens_crud")
+async def purge_expired_revoked_tokens_crud(session: AsyncSession, batch_size: int) -> int:
+    expired = (
+        select(user_models.RevokedToken.jti)
+        .where(user_models.RevokedToken.expires_at < func.timezone("utc", func.now()))
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    query = delete(user_models.RevokedToken).where(user_models.RevokedToken.jti.in_(expired.scalar_subquery()))
+    response = await session.execute(query)
+    await session.commit()
+    return response.rowcount
+
+
+@timed("db.purge_unverified_users_crud")
+async def purge_unverified_users_crud(session: AsyncSession, batch_size: int,
+                                      created_before: datetime.datetime) -> int:
+    stale = (
+        select(user_models.User.id)
+        .where(~user_models.User.is_verified, user_models.User.created_at < created_before)
+        .order_by(user_models.User.created_at)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+        .cte("stale")
+    )
+    roles_deleted = (
+        delete(user_models.UserRole)
+        .where(user_models.UserRole.user_id.in_(select(stale.c.id)))
+        .cte("roles_deleted")
+    )
+    query = (
+        delete(user_models.User)
+        .where(user_models.User.id.in_(select(stale.c.id)))
+        .returning(user_models.User.id)
+        .add_cte(roles_deleted)
+    )
+    response = await session.execute(query)
+    deleted = len(response.all())
+    await session.commit()
+    return deleted
+
+
+@timed("db.analyze_table_crud")
+async def analyze_table_crud(session: AsyncSession, table: str):
+    await session.execute(text(f'ANALYZE "{table}"'))
+    await session.commit()
+
+
+@timed("db.create_refresh_session_crud")
+async def create_refresh_session_crud(session: AsyncSession, family_id: uuid.UUID, user_id: int, jti: str,
+                                      expires_at: datetime.datetime):
+    query = insert(user_models.RefreshSession).values(
+        id=family_id, user_id=user_id, current_jti=jti, expires_at=expires_at
+    )
+    await session.execute(query)
+    await session.commit()
+
+
+@timed("db.rotate_refresh_session_crud")
+async def rotate_refresh_session_crud(session: AsyncSession, family_id: uuid.UUID, old_jti: str, new_jti: str):
+    query = (
+        update(user_models.RefreshSession)
+        .where(
+            user_models.RefreshSession.id == family_id,
+            user_models.RefreshSession.current_jti == old_jti,
+            user_models.RefreshSession.revoked_at.is_(None),
+            user_models.RefreshSession.expires_at > func.timezone("utc", func.now()),
+        )
+        .values(current_jti=new_jti)
+        .returning(user_models.RefreshSession.expires_at)
+    )
+    response = await session.execute(query)
+    row = response.first()
+    await session.commit()
+    return row
+
+
+@timed("db.revoke_refresh_session_crud")
+async def revoke_refresh_session_crud(session: AsyncSession, family_id: uuid.UUID, user_id: int | None = None) -> int:
+    query = (
+        update(user_models.RefreshSession)
+        .where(user_models.RefreshSession.id == family_id, user_models.RefreshSession.revoked_at.is_(None))
+        .values(revoked_at=func.timezone("utc", func.now()))
+    )
+    if user_id is not None:
+        query = query.where(user_models.RefreshSession.user_id == user_id)
+    response = await session.execute(query)
+    await session.commit()
+    return response.rowcount
+
+
+@timed("db.revoke_user_sessions_crud")
+async def revoke_user_sessions_crud(session: AsyncSession, user_id: int):
+    revoked = (
+        update(user_models.RefreshSession)
+        .where(user_models.RefreshSession.user_id == user_id, user_models.RefreshSession.revoked_at.is_(None))
+        .values(revoked_at=func.timezone("utc", func.now()))
+        .returning(user_models.RefreshSession.id)
+        .cte("revoked")
+    )
+    query = (
+        update(user_models.User)
+        .where(user_models.User.id == user_id)
+        .values(token_version=user_models.User.token_version + 1)
+        .add_cte(revoked)
+    )
+    await session.execute(query)
+    await session.commit()
+
+
+@timed("db.get_user_sessions_crud")
+async def get_user_sessions_crud(session: AsyncSession, user_id: int):
+    query = (
+        select(user_models.RefreshSession.id, user_models.RefreshSession.created_at,
+               user_models.RefreshSession.expires_at)
+        .where(
+            user_models.RefreshSession.user_id == user_id,
+            user_models.RefreshSession.revoked_at.is_(None),
+            user_models.RefreshSession.expires_at > func.timezone("utc", func.now()),
+        )
+        .order_by(user_models.RefreshSession.created_at.desc())
+    )
+    response = await session.execute(query)
+    return response.all()
+
+
+@timed("db.purge_refresh_sessions_crud")
+async def purge_refresh_sessions_crud(session: AsyncSession, batch_size: int) -> int:
+    expired = (
+        select(user_models.RefreshSession.id)
+        .where(user_models.RefreshSession.expires_at < func.timezone("utc", func.now()))
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    query = delete(user_models.RefreshSession).where(user_models.RefreshSession.id.in_(expired.scalar_subquery()))
+    response = await session.execute(query)
+    await session.commit()
+    return response.rowcount
+
+
+@timed("db.list_users_crud")
+async def list_users_crud(session: AsyncSession, user_filter: user_schemas.UserFilter, limit: int,
+                          after: tuple[datetime.datetime, int] | None = None) -> list:
+    query = queries.admin_users(**user_filter.model_dump())
+    if after is not None:
+        query = query.where(tuple_(user_models.User.created_at, user_models.User.id) > tuple_(*after))
+    response = await session.execute(query.limit(limit))
+    return response.all()
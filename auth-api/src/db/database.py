@@ -1,6 +1,9 @@
+import asyncio
+import time
 from typing import AsyncGenerator
 
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy import AsyncAdaptedQueuePool, exc
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, AsyncEngine
 from sqlalchemy.orm import DeclarativeBase, sessionmaker
 from core.config import settings
 
@@ -9,12 +12,101 @@ class Base(DeclarativeBase):
     pass
 
 
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.checkout_seconds = 0.0
+        self.max_checkout_seconds = 0.0
+        self.timeouts = 0
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            self.checkouts += 1
+            self.checkout_seconds += elapsed
+            self.max_checkout_seconds = max(self.max_checkout_seconds, elapsed)
+
+
+def create_engine(url: str) -> AsyncEngine:
+    return create_async_engine(
+        url,
+        poolclass=InstrumentedQueuePool,
+        pool_size=settings.db.db_pool_size,
+        max_overflow=settings.db.db_max_overflow,
+        pool_timeout=settings.db.db_pool_timeout,
+        pool_recycle=settings.db.db_pool_recycle,
+        pool_pre_ping=settings.db.db_pool_pre_ping,
+        connect_args={
+            "prepared_statement_cache_size": settings.db.db_statement_cache_size,
+            "statement_cache_size": settings.db.db_statement_cache_size,
+        },
+    )
+
+
 SQLALCHEMY_DATABASE_URL = f"postgresql+asyncpg://{settings.db.db_user}:{settings.db.db_pass}@{settings.db.db_host}:{settings.db.db_port}/{settings.db.db_name}"
-engine = create_async_engine(SQLALCHEMY_DATABASE_URL)
+SQLALCHEMY_REPLICA_URL = f"postgresql+asyncpg://{settings.db.db_user}:{settings.db.db_pass}@{settings.db.db_replica_host}:{settings.db.db_replica_port}/{settings.db.db_name}" if settings.db.db_replica_host else None
+engine: AsyncEngine | None = None
+read_engine: AsyncEngine | None = None
+
+async_session = sessionmaker(class_=AsyncSession, expire_on_commit=False)
+async_read_session = sessionmaker(class_=AsyncSession, expire_on_commit=False)
+
+
+def init_engines() -> AsyncEngine:
+    global engine, read_engine
+    if engine is None:
+        engine = create_engine(SQLALCHEMY_DATABASE_URL)
+        read_engine = create_engine(SQLALCHEMY_REPLICA_URL) if SQLALCHEMY_REPLICA_URL else engine
+        async_session.configure(bind=engine)
+        async_read_session.configure(bind=read_engine)
+    return engine
 
-async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+async def dispose_engines() -> None:
+    global engine, read_engine
+    if engine is None:
+        return
+    await engine.dispose()
+    if read_engine is not engine:
+        await read_engine.dispose()
+    engine = read_engine = None
 
 
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
     async with async_session() as session:
         yield session
+
+
+async def get_read_session() -> AsyncGenerator[AsyncSession, None]:
+    async with async_read_session() as session:
+        yield session
+
+
+async def warm_up_pool(engine: AsyncEngine, connections: int) -> None:
+    connections = min(connections, settings.db.db_pool_size)
+    opened = [engine.connect() for _ in range(connections)]
+    try:
+        await asyncio.gather(*(connection.start() for connection in opened))
+    finally:
+        await asyncio.gather(*(connection.close() for connection in opened), return_exceptions=True)
+
+
+def pool_stats(engine: AsyncEngine) -> dict:
+    pool = engine.pool
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(0, pool.overflow()),
+        "checkouts": pool.checkouts,
+        "checkout_seconds_total": round(pool.checkout_seconds, 6),
+        "checkout_seconds_max": round(pool.max_checkout_seconds, 6),
+        "timeouts": pool.timeouts,
+    }
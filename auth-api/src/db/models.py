@@ -1,6 +1,7 @@
 import datetime
+import uuid
 from typing import Annotated
-from sqlalchemy import text, ForeignKey
+from sqlalchemy import text, ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .database import Base
@@ -13,13 +14,20 @@ class User(Base):
 
     id: Mapped[int] = mapped_column(primary_key=True)
     full_name: Mapped[str]
-    email: Mapped[str] = mapped_column(unique=True)
+    email: Mapped[str]
     hashed_password: Mapped[bytes]
     active: Mapped[bool] = mapped_column(default=True)
     is_verified: Mapped[bool] = mapped_column(default=False)
-    roles: Mapped[list["Role"]] = relationship(secondary="users_roles")
+    token_version: Mapped[int] = mapped_column(default=0, server_default=text("0"))
+    roles: Mapped[list["Role"]] = relationship(secondary="users_roles", back_populates="users")
     created_at: Mapped[created_at]
 
+    __table_args__ = (
+        Index("ix_users_unverified_created_at", "created_at", postgresql_where=text("NOT is_verified")),
+        Index("ix_users_email_lower", text("lower(email)"), unique=True),
+        Index("ix_users_created_at_id", "created_at", "id"),
+    )
+
 
 class Role(Base):
     __tablename__ = "roles"
@@ -27,7 +35,7 @@ class Role(Base):
     id: Mapped[int] = mapped_column(primary_key=True)
     title: Mapped[str]
     description: Mapped[str]
-    users: Mapped[list["User"]] = relationship(secondary="users_roles")
+    users: Mapped[list["User"]] = relationship(secondary="users_roles", back_populates="roles")
 
 
 class UserRole(Base):
@@ -35,3 +43,22 @@ class UserRole(Base):
 
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), primary_key=True)
     role_id: Mapped[int] = mapped_column(ForeignKey("roles.id"), primary_key=True)
+
+
+class RevokedToken(Base):
+    __tablename__ = "revoked_tokens"
+
+    jti: Mapped[str] = mapped_column(primary_key=True)
+    expires_at: Mapped[datetime.datetime] = mapped_column(index=True)
+    revoked_at: Mapped[created_at] = mapped_column(index=True)
+
+
+class RefreshSession(Base):
+    __tablename__ = "refresh_sessions"
+
+    id: Mapped[uuid.UUID] = mapped_column(primary_key=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), index=True)
+    current_jti: Mapped[str]
+    expires_at: Mapped[datetime.datetime] = mapped_column(index=True)
+    revoked_at: Mapped[datetime.datetime | None]
+    created_at: Mapped[created_at]
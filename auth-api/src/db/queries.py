@@ -0,0 +1,73 @@
+from sqlalchemy import Select, String, any_, bindparam, exists, func, select
+from sqlalchemy.dialects.postgresql import ARRAY
+
+from db.models import Role, User, UserRole
+
+role_ids = func.array_agg(Role.id).filter(Role.id.is_not(None)).label("role_ids")
+role_titles = func.array_agg(Role.title).filter(Role.id.is_not(None)).label("role_titles")
+
+USER_RECORD_COLUMNS = (
+    User.id,
+    User.email,
+    User.full_name,
+    User.active,
+    User.is_verified,
+    User.created_at,
+    User.token_version,
+    role_ids,
+    role_titles,
+)
+
+
+def user_records() -> Select:
+    return (
+        select(*USER_RECORD_COLUMNS)
+        .outerjoin(UserRole, UserRole.user_id == User.id)
+        .outerjoin(Role, Role.id == UserRole.role_id)
+        .group_by(User.id)
+    )
+
+
+password_by_email = select(User.id, User.hashed_password).where(
+    func.lower(User.email) == bindparam("email", type_=String)
+)
+email_exists = select(exists().where(func.lower(User.email) == bindparam("email", type_=String)))
+
+user_record_by_email = user_records().where(func.lower(User.email) == bindparam("email", type_=String))
+user_records_by_emails = user_records().where(
+    func.lower(User.email) == any_(bindparam("emails", type_=ARRAY(String)))
+)
+login_row_by_email = (
+    user_records()
+    .add_columns(User.hashed_password)
+    .where(func.lower(User.email) == bindparam("email", type_=String))
+)
+
+roles = select(Role.id, Role.title)
+
+admin_role_titles = (
+    select(func.array_agg(Role.title))
+    .join(UserRole, UserRole.role_id == Role.id)
+    .where(UserRole.user_id == User.id)
+    .correlate(User)
+    .scalar_subquery()
+    .label("roles")
+)
+
+
+def admin_users(active: bool | None, is_verified: bool | None, role: str | None) -> Select:
+    query = (
+        select(User.id, User.email, User.full_name, User.active, User.is_verified, User.created_at,
+               admin_role_titles)
+        .order_by(User.created_at, User.id)
+    )
+    if active is not None:
+        query = query.where(User.active.is_(active))
+    if is_verified is not None:
+        query = query.where(User.is_verified.is_(is_verified))
+    if role is not None:
+        query = query.where(
+            exists()
+            .where(UserRole.user_id == User.id, UserRole.role_id == Role.id, Role.title == role)
+        )
+    return query
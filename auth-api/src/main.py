@@ -1,9 +1,55 @@
+from contextlib import asynccontextmanager
+
 import uvicorn
 from fastapi import FastAPI
+from api import metrics, well_known
 from api.v1 import views
-app = FastAPI()
+from core.hashing import password_hasher
+from core.keys import key_manager
+from core.maintenance import maintenance_scheduler
+from core.mail import mail_queue
+from core.metrics import MetricsMiddleware
+from core.revocation import revocation_index
+from core.roles import role_table
+from core.throttling import login_throttle
+from core.config import settings
+from db import database
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    engine = database.init_engines()
+    key_manager.load()
+    await database.warm_up_pool(engine, settings.db.db_pool_warmup)
+    if database.read_engine is not engine:
+        await database.warm_up_pool(database.read_engine, settings.db.db_pool_warmup)
+    password_hasher.start()
+    if settings.hashing.target_ms > 0:
+        await password_hasher.calibrate(settings.hashing.target_ms)
+    mail_queue.start()
+    await revocation_index.start()
+    if settings.maintenance.enabled:
+        maintenance_scheduler.start()
+    await role_table.load()
+    app.openapi()
+    yield
+    await maintenance_scheduler.stop()
+    await revocation_index.stop()
+    await mail_queue.stop()
+    await login_throttle.close()
+    password_hasher.shutdown()
+    await database.dispose_engines()
+
+
+def create_app() -> FastAPI:
+    app = FastAPI(lifespan=lifespan)
+
+    app.include_router(views.router)
+    app.include_router(well_known.router)
+    app.include_router(metrics.router)
+    app.add_middleware(MetricsMiddleware)
+    return app
 
-app.include_router(views.router)
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    uvicorn.run(create_app(), host="0.0.0.0", port=8000)
@@ -0,0 +1,26 @@
+"""users token version
+
+Revision ID: 18781930f681
+Revises: c00be109c0a8
+Create Date: 2026-10-18 10:12:40.418311
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '18781930f681'
+down_revision: Union[str, None] = 'c00be109c0a8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('token_version', sa.Integer(), server_default=sa.text('0'), nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'token_version')
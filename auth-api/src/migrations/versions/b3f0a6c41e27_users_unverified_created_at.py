@@ -0,0 +1,29 @@
+"""users unverified created_at index
+
+Revision ID: b3f0a6c41e27
+Revises: 5d1c7e9a2b64
+Create Date: 2026-10-18 16:40:12.731904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3f0a6c41e27'
+down_revision: Union[str, None] = '5d1c7e9a2b64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index('ix_users_unverified_created_at', 'users', ['created_at'], unique=False,
+                        postgresql_where=sa.text('NOT is_verified'), postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_users_unverified_created_at', table_name='users', postgresql_concurrently=True)